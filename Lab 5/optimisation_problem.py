@@ -1,6 +1,8 @@
 """Main script for the task."""
 
-from typing import Callable, List, Tuple
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence, Tuple
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy import optimize
@@ -56,18 +58,151 @@ def constr_x_2(decision_vars: Tuple[float, float]) -> float:
     return ham_traditional
 
 
-def optimise() -> Tuple[float, float]:
-    """Main optimisation method."""
+CONSTRAINTS = [constr_flesh, constr_filler, constr_salt, constr_x_1, constr_x_2]
+
+
+# ########## Instrumentation of the solver ##########
+# Count calls and measure time spent in each callable.
+# ###################################################
+
+
+@dataclass
+class CallStats:
+    """Statistics collected for a single instrumented callable."""
+    name: str
+    calls: int = 0
+    total_time: float = 0.0
+    trajectory: List[Tuple[Tuple[float, ...], float]] = field(default_factory=list)
+
+    @property
+    def mean_time(self) -> float:
+        """Average wall time of a single call in seconds."""
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class InstrumentedCallable:
+    """Wrapper counting calls and cumulative wall time of a callable."""
+
+    def __init__(self, func: Callable, log_trajectory: bool = False) -> None:
+        self.func = func
+        self.log_trajectory = log_trajectory
+        self.stats = CallStats(name=func.__name__)
+        self.__name__ = func.__name__
+
+    def __call__(self, decision_vars: Sequence[float]) -> float:
+        start = time.perf_counter()
+        value = self.func(decision_vars)
+        self.stats.total_time += time.perf_counter() - start
+        self.stats.calls += 1
+        if self.log_trajectory:
+            self.stats.trajectory.append((tuple(np.ravel(decision_vars)), float(value)))
+        return value
+
+
+@dataclass
+class EvaluationReport:
+    """Structured report of callable evaluations made during optimisation."""
+    stats: Dict[str, CallStats]
+    solver_time: float = 0.0
+    runs: int = 1
+
+    @property
+    def total_calls(self) -> int:
+        """Number of calls summed over all callables."""
+        return sum(stat.calls for stat in self.stats.values())
+
+    @property
+    def callables_time(self) -> float:
+        """Wall time spent inside instrumented callables."""
+        return sum(stat.total_time for stat in self.stats.values())
+
+    @property
+    def overhead_time(self) -> float:
+        """Wall time spent inside the solver itself."""
+        return max(self.solver_time - self.callables_time, 0.0)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Report as a plain dictionary, e.g. for JSON serialisation."""
+        return {
+            name: {
+                "calls": stat.calls,
+                "calls_per_run": stat.calls / self.runs,
+                "total_time": stat.total_time,
+                "mean_time": stat.mean_time,
+            }
+            for name, stat in self.stats.items()
+        }
+
+    def __str__(self) -> str:
+        lines = [f"{'callable':<16}{'calls':>10}{'total [ms]':>14}{'mean [us]':>12}"]
+        for name, stat in self.stats.items():
+            lines.append(
+                f"{name:<16}{stat.calls:>10}{stat.total_time*1e3:>14.3f}{stat.mean_time*1e6:>12.3f}"
+            )
+        lines.append(f"solver time: {self.solver_time*1e3:.3f} [ms] in {self.runs} run(s), "
+                     f"overhead: {self.overhead_time*1e3:.3f} [ms]")
+        return "\n".join(lines)
+
+
+def instrument(
+    funcs: List[Callable], log_trajectory: bool = False
+) -> List[InstrumentedCallable]:
+    """Wrap each callable with an InstrumentedCallable."""
+    return [InstrumentedCallable(func, log_trajectory) for func in funcs]
+
+
+def _collect_report(
+    wrapped: List[InstrumentedCallable], solver_time: float, runs: int = 1
+) -> EvaluationReport:
+    """Gather statistics of wrapped callables into a report."""
+    return EvaluationReport(
+        stats={func.stats.name: func.stats for func in wrapped},
+        solver_time=solver_time,
+        runs=runs,
+    )
+
+
+def optimise_with_report(
+    log_trajectory: bool = False
+) -> Tuple[np.ndarray, EvaluationReport]:
+    """Optimisation method returning also a report of the callables evaluations."""
+    wrapped_objective, *wrapped_constraints = instrument(
+        [objective, *CONSTRAINTS], log_trajectory
+    )
     ham_budget, ham_traditional = 0, 0
+    start = time.perf_counter()
     x_opt = optimize.fmin_cobyla(
-        func=objective,
-        x0=[ham_budget, ham_traditional], 
-        cons=[constr_flesh, constr_filler, constr_salt, constr_x_1, constr_x_2],
+        func=wrapped_objective,
+        x0=[ham_budget, ham_traditional],
+        cons=wrapped_constraints,
     )
+    solver_time = time.perf_counter() - start
+    report = _collect_report([wrapped_objective, *wrapped_constraints], solver_time)
+    return x_opt, report
+
+
+def optimise() -> Tuple[float, float]:
+    """Main optimisation method."""
+    x_opt, _ = optimise_with_report()
     print(x_opt)
     return x_opt
 
 
+def benchmark_optimise(runs: int = 100) -> EvaluationReport:
+    """Repeat the optimisation and return a report aggregated over all runs."""
+    wrapped = instrument([objective, *CONSTRAINTS])
+    wrapped_objective, *wrapped_constraints = wrapped
+    start = time.perf_counter()
+    for _ in range(runs):
+        optimize.fmin_cobyla(
+            func=wrapped_objective,
+            x0=[0, 0],
+            cons=wrapped_constraints,
+        )
+    solver_time = time.perf_counter() - start
+    return _collect_report(wrapped, solver_time, runs)
+
+
 # ########## Visualisation functions ############
 # Do not analyse them - they're just to hepl you.
 # ###############################################
@@ -135,7 +270,8 @@ def visualise_optimisation(
 
 if __name__ == "__main__":
 
-    x_1_opt, x_2_opt = optimise()
+    (x_1_opt, x_2_opt), report = optimise_with_report()
+    print(report)
 
     print(f"Found optimal solution:")
     print(f"\tas: x_1: {round(x_1_opt, 2)} [kg], x_2: {round(x_2_opt, 2)} [kg]")
@@ -149,5 +285,5 @@ if __name__ == "__main__":
         objective,
         [x_1_opt, x_2_opt],
         [-2000, 2000, -2000, 2000],
-        [constr_flesh, constr_filler, constr_salt, constr_x_1, constr_x_2],
+        CONSTRAINTS,
     )
@@ -6,7 +6,8 @@ import numpy as np
 import pytest
 
 from optimisation_problem import (
-    constr_filler, constr_flesh, constr_salt, constr_x_2, income, optimise
+    constr_filler, constr_flesh, constr_salt, constr_x_2, income, optimise,
+    objective, InstrumentedCallable, benchmark_optimise, optimise_with_report
 )
 
 x_1_test = [33,-10,  96,  22,  96]
@@ -93,3 +94,29 @@ def test_optimise():
     np.testing.assert_almost_equal(
         optimise(), np.array([425.09202593,874.94887448]), decimal=2
     )
+
+
+def test_instrumented_callable():
+    wrapped = InstrumentedCallable(objective, log_trajectory=True)
+    assert wrapped([1, 2]) == objective([1, 2])
+    assert wrapped([0, 0]) == 0
+    assert wrapped.stats.calls == 2
+    assert wrapped.stats.total_time >= 0
+    assert wrapped.stats.trajectory == [((1, 2), -63.0), ((0, 0), 0.0)]
+
+
+def test_optimise_with_report():
+    x_opt, report = optimise_with_report()
+    np.testing.assert_array_equal(x_opt, optimise())
+    assert set(report.stats) == {
+        "objective", "constr_flesh", "constr_filler", "constr_salt", "constr_x_1", "constr_x_2"
+    }
+    assert report.stats["objective"].calls > 0
+    assert report.total_calls == sum(entry["calls"] for entry in report.as_dict().values())
+
+
+def test_benchmark_optimise():
+    _, single_report = optimise_with_report()
+    report = benchmark_optimise(runs=3)
+    assert report.runs == 3
+    assert report.stats["objective"].calls == 3 * single_report.stats["objective"].calls
@@ -0,0 +1,200 @@
+"""Benchmark of the Nelder-Mead implementation against standard test functions and SciPy."""
+
+import csv
+import json
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import optimize
+
+from optimization_nelder_mead import (
+    SimplexHistory, SimplexND, initial_simplex, rosenbrock_function, run_nelder_mead
+)
+
+
+# ########## Test functions ##########
+# All functions take a single point and have a global minimum equal to 0.
+# ####################################
+
+def sphere_function(x: np.ndarray) -> float:
+    """Sphere function, minimum at 0."""
+    return np.sum(np.square(x))
+
+
+def rastrigin_function(x: np.ndarray) -> float:
+    """Rastrigin function, minimum at 0."""
+    x = np.asarray(x)
+    return 10 * x.size + np.sum(np.square(x) - 10 * np.cos(2 * np.pi * x))
+
+
+def ackley_function(x: np.ndarray) -> float:
+    """Ackley function, minimum at 0."""
+    x = np.asarray(x)
+    return (
+        -20 * np.exp(-0.2 * np.sqrt(np.mean(np.square(x))))
+        - np.exp(np.mean(np.cos(2 * np.pi * x)))
+        + 20 + np.e
+    )
+
+
+# name: (function, bounds of the start point region)
+BENCHMARK_FUNCTIONS: Dict[str, Tuple[Callable, Tuple[float, float]]] = {
+    "rosenbrock": (rosenbrock_function, (-2., 2.)),
+    "sphere": (sphere_function, (-5., 5.)),
+    "rastrigin": (rastrigin_function, (-5.12, 5.12)),
+    "ackley": (ackley_function, (-5., 5.)),
+}
+
+
+class EvaluationTracker:
+    """Objective function wrapper counting evaluations until the value drops below the target."""
+
+    def __init__(self, objective_function: Callable, target_value: float) -> None:
+        self.objective_function = objective_function
+        self.target_value = target_value
+        self.evaluations = 0
+        self.evaluations_to_target: Optional[int] = None
+        self.best_value = np.inf
+
+    def __call__(self, x: np.ndarray) -> float:
+        value = self.objective_function(x)
+        self.evaluations += 1
+        self.best_value = min(self.best_value, float(value))
+        if self.evaluations_to_target is None and value <= self.target_value:
+            self.evaluations_to_target = self.evaluations
+        return value
+
+
+def _run_own(objective: Callable, simplex: np.ndarray, adaptive: bool, max_iter: int) -> None:
+    """Run the Nelder-Mead implementation of this module."""
+    # Memoisation is disabled so the tracker sees the same evaluations as the optimiser
+    nd_simplex = SimplexND(simplex, objective, cache_size=0)
+    history = SimplexHistory(nd_simplex.dim, capacity=1, ring=True)
+    run_nelder_mead(nd_simplex, max_iter=max_iter, adaptive=adaptive, history=history)
+
+
+def _run_scipy(objective: Callable, simplex: np.ndarray, adaptive: bool, max_iter: int) -> None:
+    """Run the Nelder-Mead implementation of SciPy from the same initial simplex."""
+    optimize.minimize(
+        objective,
+        simplex[0],
+        method="Nelder-Mead",
+        options={
+            "initial_simplex": simplex,
+            "maxiter": max_iter,
+            "maxfev": np.inf,
+            "xatol": 1e-8,
+            "fatol": 1e-12,
+            "adaptive": adaptive,
+        },
+    )
+
+
+SOLVERS: Dict[str, Callable] = {"own": _run_own, "scipy": _run_scipy}
+
+
+def run_benchmark(
+    dims: Sequence[int] = (2, 5, 10, 20, 50, 100),
+    functions: Sequence[str] = tuple(BENCHMARK_FUNCTIONS),
+    tol: float = 1e-6,
+    max_iter_per_dim: int = 1000,
+    seed: int = 0
+) -> List[dict]:
+    """
+    Run both solvers, with standard and adaptive parameters, on every test function and dimension.
+
+    :param dims: dimensions of the test problems
+    :param functions: names of the test functions from BENCHMARK_FUNCTIONS
+    :param tol: target of the final error, used to count evaluations-to-tolerance
+    :param max_iter_per_dim: iteration budget per dimension of the problem
+    :param seed: seed of the start points
+
+    :return: one row per (function, dimension, solver, parameters) with the measured performance
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name in functions:
+        objective_function, (low, high) = BENCHMARK_FUNCTIONS[name]
+        for dim in dims:
+            simplex = initial_simplex(rng.uniform(low, high, size=dim), step=0.1)
+            for solver_name, solver in SOLVERS.items():
+                for adaptive in (False, True):
+                    tracker = EvaluationTracker(objective_function, target_value=tol)
+                    start_time = time.perf_counter()
+                    solver(tracker, simplex, adaptive, max_iter_per_dim * dim)
+                    rows.append({
+                        "function": name,
+                        "dim": dim,
+                        "solver": solver_name,
+                        "adaptive": adaptive,
+                        "evaluations": tracker.evaluations,
+                        "evaluations_to_tol": tracker.evaluations_to_target,
+                        "wall_time": time.perf_counter() - start_time,
+                        "final_error": tracker.best_value,
+                    })
+    return rows
+
+
+def save_report(rows: List[dict], file_path: str) -> None:
+    """
+    Save benchmark results as a CSV or JSON file, chosen by the file extension.
+
+    :param rows: benchmark results
+    :param file_path: path of the .csv or .json report
+    """
+    if file_path.endswith(".json"):
+        with open(file_path, "w") as file:
+            json.dump(rows, file, indent=2)
+    elif file_path.endswith(".csv"):
+        with open(file_path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        raise ValueError("Invalid report format. File must have .csv or .json extension!")
+
+
+def find_regressions(baseline: List[dict], rows: List[dict], threshold: float = 1.2) -> List[dict]:
+    """
+    Compare benchmark results with a baseline report.
+
+    :param baseline: rows of a previous report
+    :param rows: rows of the current report
+    :param threshold: allowed ratio of current to baseline evaluations and wall time
+
+    :return: rows of the current report which are worse than the baseline
+    """
+    def key(row: dict) -> tuple:
+        return row["function"], int(row["dim"]), row["solver"], str(row["adaptive"])
+
+    baseline_rows = {key(row): row for row in baseline}
+    regressions = []
+    for row in rows:
+        reference = baseline_rows.get(key(row))
+        if reference is None:
+            continue
+        if (
+            float(row["evaluations"]) > threshold * float(reference["evaluations"])
+            or float(row["wall_time"]) > threshold * float(reference["wall_time"])
+        ):
+            regressions.append(row)
+    return regressions
+
+
+# ########## Entrypoint to the benchmark ##############
+# Run this script as an entrypoint to generate reports
+#######################################################
+
+if __name__ == "__main__":
+
+    results = run_benchmark()
+    save_report(results, "benchmark_report.csv")
+    save_report(results, "benchmark_report.json")
+    for result in results:
+        print(
+            f"{result['function']:>10} dim={result['dim']:<4} {result['solver']:>5} "
+            f"adaptive={result['adaptive']!s:<5} evaluations={result['evaluations']:<8} "
+            f"to tol={result['evaluations_to_tol']!s:<8} time={result['wall_time']:.3f}s "
+            f"error={result['final_error']:.3e}"
+        )
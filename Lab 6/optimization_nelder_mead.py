@@ -1,46 +1,305 @@
 """Main script for the task."""
 
-from typing import Callable, List, Tuple
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import LineCollection
+from scipy.stats import qmc
 
 
-class Simplex2D:
-    """A class simulating 2D space simplex, i.e. a triangle."""
+class CachedObjective:
+    """A wrapper of the objective function memoising values of recently evaluated points (LRU policy)."""
 
-    def __init__(self, x_1: Tuple[float, float], x_2: Tuple[float, float], x_3: Tuple[float, float], objective_function: Callable) -> None:
+    def __init__(self, objective_function: Callable, maxsize: int = 128) -> None:
         """
         Initialise the object.
 
-        :param x_1: coordinates of the point from the 2D space
-        :param x_2: coordinates of the point from the 2D space
-        :param x_3: coordinates of the point from the 2D space
+        :param objective_function: objective function to wrap
+        :param maxsize: max number of memoised points, defaults to 128
+        """
+        self.objective_function = objective_function
+        self.maxsize = maxsize
+        self.evaluations = 0
+        self.speculative_evaluations = 0   # Evaluated in an executor but not needed by the run
+        self.calls = 0
+        self.hits = 0
+        self._cache = OrderedDict()
+
+    def __call__(self, x: np.ndarray) -> float:
+        """
+        Return the value of the objective function, evaluating it only if the point is not memoised.
+
+        :param x: input parameters vector
+
+        :return: value of the objective function for given input
+        """
+        x = np.asarray(x, dtype=float)
+        value = self.get(x)
+        if value is None:
+            value = self.objective_function(x)
+            self.put(x, value)
+        return value
+
+    def get(self, x: np.ndarray) -> Optional[float]:
+        """
+        Return the memoised value of the objective function without evaluating it.
+
+        :param x: input parameters vector
+
+        :return: memoised value or None if the point was not evaluated recently
+        """
+        x = np.asarray(x, dtype=float)
+        key = (x.shape, x.tobytes())
+        if key not in self._cache:
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return self._cache[key]
+
+    def put(self, x: np.ndarray, value: float, speculative: bool = False) -> None:
+        """
+        Memoise the value of the objective function evaluated outside of the wrapper (e.g. in an executor).
+
+        :param x: input parameters vector
+        :param value: value of the objective function
+        :param speculative: the value was not needed, it is counted in speculative_evaluations
+            instead of evaluations, defaults to False
+        """
+        x = np.asarray(x, dtype=float)
+        if speculative:
+            self.speculative_evaluations += 1
+        else:
+            self.evaluations += 1
+        self.calls += 1
+        self._store((x.shape, x.tobytes()), value)
+
+    def evaluate_many(self, points: np.ndarray, vectorized: bool = False, executor: Optional[Executor] = None) -> np.ndarray:
+        """
+        Return values of the objective function for many points, evaluating only the points which are not memoised.
+
+        :param points: (k, n) array of input parameters vectors
+        :param vectorized: the objective function takes an (n, k) array of stacked coordinates and returns k values,
+            so all missing points are evaluated in a single call, defaults to False
+        :param executor: executor evaluating missing points concurrently if the objective is not vectorized,
+            defaults to None
+
+        :return: (k,) array of values of the objective function
+        """
+        points = np.asarray(points, dtype=float)
+        keys = [(point.shape, point.tobytes()) for point in points]
+        values = np.empty(len(points))
+        missing = []
+        for idx, key in enumerate(keys):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                values[idx] = self._cache[key]
+            else:
+                missing.append(idx)
+        if missing:
+            if vectorized:
+                values[missing] = self.objective_function(points[missing].T)
+                self.calls += 1
+            elif executor is not None:
+                values[missing] = list(executor.map(self.objective_function, points[missing]))
+                self.calls += len(missing)
+            else:
+                values[missing] = [self.objective_function(points[idx]) for idx in missing]
+                self.calls += len(missing)
+            self.evaluations += len(missing)
+            for idx in missing:
+                self._store(keys[idx], values[idx])
+        return values
+
+    def _store(self, key: tuple, value: float) -> None:
+        self._cache[key] = value
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+
+def _evaluate_vectorized_point(objective_function: Callable, point: np.ndarray) -> float:
+    """Evaluate a vectorized objective function for a single point (module level, so it can be pickled)."""
+    return float(objective_function(np.asarray(point)[:, np.newaxis])[0])
+
+
+class SimplexND:
+    """A class simulating n-dimensional space simplex, i.e. n+1 vertices stored in a single array."""
+
+    def __init__(self, points: np.ndarray, objective_function: Callable, cache_size: int = 128, vectorized: bool = False) -> None:
+        """
+        Initialise the object.
+
+        :param points: (n+1, n) array of coordinates of the simplex vertices
         :param objective_function: objective function to optimise
+        :param cache_size: number of memoised objective function values, 0 disables memoisation, defaults to 128
+        :param vectorized: the objective function takes an (n, k) array of stacked coordinates and returns k values,
+            so the simplex evaluates many points in a single call, defaults to False
         """
+        self.vectorized = vectorized
+        if cache_size > 0 and not isinstance(objective_function, CachedObjective):
+            objective_function = CachedObjective(objective_function, maxsize=max(cache_size, len(points)))
         self.objective_function = objective_function
-        self._x, self._y = self._sort([x_1, x_2, x_3])
+        self._x, self._y = self._sort(points)
+        self._sum = self._x.sum(axis=0)
 
-    def _sort(self, points: List[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    def _sort(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
         Sort simplex elements according to the value of the objective function.
 
-        :param points: three (X, Y) points of the simplex
+        :param points: n+1 points of the simplex
 
-        :return: simplex with elements sorted in descending order by value of objective function
+        :return: simplex with elements sorted in ascending order by value of objective function
         """
-        func_vals = np.array([self.objective_function(func_arg) for func_arg in points])
-        sorting_order = np.argsort(func_vals)
-        return np.array(points)[sorting_order], func_vals[sorting_order]
-    
+        points = np.array(points, dtype=float)
+        if points.ndim != 2 or points.shape[0] != points.shape[1] + 1:
+            raise ValueError("Invalid simplex shape. Simplex must consist of n+1 points of the n-dimensional space!")
+        func_vals = self.evaluate_many(points)
+        sorting_order = np.argsort(func_vals, kind='stable')
+        return points[sorting_order], func_vals[sorting_order]
+
+    def evaluate(self, point: np.ndarray) -> float:
+        """
+        Evaluate the objective function for a single point.
+
+        :param point: input parameters vector
+
+        :return: value of the objective function
+        """
+        if self.vectorized:
+            return float(self.evaluate_many(np.asarray(point)[np.newaxis])[0])
+        return self.objective_function(point)
+
+    def evaluate_many(self, points: np.ndarray, executor: Optional[Executor] = None) -> np.ndarray:
+        """
+        Evaluate the objective function for many points, in a single call if the objective is vectorized.
+
+        :param points: (k, n) array of input parameters vectors
+        :param executor: executor evaluating the points concurrently if the objective is not vectorized, defaults to None
+
+        :return: (k,) array of values of the objective function
+        """
+        if isinstance(self.objective_function, CachedObjective):
+            return self.objective_function.evaluate_many(points, self.vectorized, executor)
+        if self.vectorized:
+            return np.asarray(self.objective_function(np.asarray(points, dtype=float).T), dtype=float)
+        if executor is not None:
+            return np.array(list(executor.map(self.objective_function, points)), dtype=float)
+        return np.array([self.objective_function(point) for point in points], dtype=float)
+
+    def submit(self, executor: Executor, point: np.ndarray) -> Tuple[Future, bool]:
+        """
+        Schedule evaluation of the objective function in the executor, unless the value is memoised.
+
+        :param executor: executor running the evaluation
+        :param point: input parameters vector
+
+        :return: future of the value and flag telling if the value has to be memoised once it is known
+        """
+        objective = self.objective_function
+        if isinstance(objective, CachedObjective):
+            value = objective.get(point)
+            if value is not None:
+                future = Future()
+                future.set_result(value)
+                return future, False
+            objective = objective.objective_function
+        if self.vectorized:
+            return executor.submit(_evaluate_vectorized_point, objective, point), True
+        return executor.submit(objective, point), True
+
+    def memoise(self, point: np.ndarray, value: float) -> None:
+        """
+        Memoise the value of the objective function evaluated outside of the simplex.
+
+        :param point: input parameters vector
+        :param value: value of the objective function
+        """
+        if isinstance(self.objective_function, CachedObjective):
+            self.objective_function.put(point, value)
+
+    def replace_worst(self, point: np.ndarray, value: float) -> None:
+        """
+        Replace the worst vertex in place, keeping the vertices ordered.
+
+        The new vertex is inserted at its position found with a binary search and the worse vertices
+        are shifted by one row, so no full re-sort nor re-evaluation of the objective function is needed.
+
+        :param point: coordinates of the new vertex
+        :param value: value of the objective function at the new vertex
+        """
+        idx = int(np.searchsorted(self._y[:-1], value, side='right'))
+        self._sum += point - self._x[-1]
+        self._x[idx + 1:] = self._x[idx:-1]
+        self._y[idx + 1:] = self._y[idx:-1]
+        self._x[idx] = point
+        self._y[idx] = value
+
+    def shrink_towards_best(self, sigma: float, executor: Optional[Executor] = None) -> None:
+        """
+        Shrink the simplex towards the best vertex, evaluating the objective function only for the moved vertices.
+
+        :param sigma: scale of shrink
+        :param executor: executor evaluating the moved vertices concurrently, defaults to None
+        """
+        new_x = shrink(self._x, sigma)
+        new_y = np.empty_like(self._y)
+        new_y[0] = self._y[0]
+        new_y[1:] = self.evaluate_many(new_x[1:], executor)
+        sorting_order = np.argsort(new_y, kind='stable')
+        self._x, self._y = new_x[sorting_order], new_y[sorting_order]
+        self._sum = self._x.sum(axis=0)
+
+    def centroid(self) -> np.ndarray:
+        """
+        Get coordinates of the centroid of all vertices except the worst one.
+
+        Uses the running sum of the vertices, so the cost is O(n) instead of O(n^2).
+
+        :return: coordinates of the centroid
+        """
+        return (self._sum - self._x[-1]) / self.dim
+
+    def diameter(self) -> float:
+        """
+        Get the size of the simplex, i.e. the largest distance (in max norm) of a vertex from the best one.
+
+        :return: diameter of the simplex
+        """
+        return float(np.max(np.abs(self._x[1:] - self._x[0])))
+
+    def spread(self) -> float:
+        """
+        Get the spread of the objective function values over the vertices.
+
+        :return: difference between the worst and the best objective function value
+        """
+        return float(self._y[-1] - self._y[0])
+
+    @property
+    def dim(self) -> int:
+        return self._x.shape[1]
+
     @property
     def x(self) -> np.ndarray:
         return self._x
-    
+
     @x.setter
     def x(self, new_x) -> np.ndarray:
         self._x, self._y = self._sort(new_x)
-    
+        self._sum = self._x.sum(axis=0)
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y
+
     @property
     def best_point_x(self) -> np.ndarray:
         return self._x[0]
@@ -56,7 +315,7 @@ class Simplex2D:
     @property
     def middle_point_y(self) -> np.ndarray:
         return self._y[-2]
-    
+
     @property
     def worst_point_x(self) -> np.ndarray:
         return self._x[-1]
@@ -64,8 +323,126 @@ class Simplex2D:
     @property
     def worst_point_y(self) -> np.ndarray:
         return self._y[-1]
+
+
+class Simplex2D(SimplexND):
+    """A class simulating 2D space simplex, i.e. a triangle."""
+
+    def __init__(self, x_1: Tuple[float, float], x_2: Tuple[float, float], x_3: Tuple[float, float], objective_function: Callable, cache_size: int = 128, vectorized: bool = False) -> None:
+        """
+        Initialise the object.
+
+        :param x_1: coordinates of the point from the 2D space
+        :param x_2: coordinates of the point from the 2D space
+        :param x_3: coordinates of the point from the 2D space
+        :param objective_function: objective function to optimise
+        :param cache_size: number of memoised objective function values, 0 disables memoisation, defaults to 128
+        :param vectorized: the objective function takes a (2, k) array of stacked coordinates and returns k values,
+            defaults to False
+        """
+        super().__init__([x_1, x_2, x_3], objective_function, cache_size, vectorized)
     
 
+class SimplexHistory:
+    """A recorder of simplex snapshots backed by a single preallocated (capacity, n+1, n) array."""
+
+    def __init__(self, dim: int, capacity: int = 1024, ring: bool = False, every: int = 1, filename: Optional[str] = None) -> None:
+        """
+        Initialise the object.
+
+        :param dim: dimension of the optimised space
+        :param capacity: number of snapshots which fit in the buffer, defaults to 1024
+        :param ring: keep only the latest `capacity` snapshots, overwriting the oldest ones, defaults to False
+        :param every: decimation step, only every k-th snapshot is stored, defaults to 1
+        :param filename: path of a .npy file to spill the buffer to as a memory-mapped array, defaults to None
+        """
+        if capacity < 1 or every < 1:
+            raise ValueError("Invalid history size. Capacity and decimation step must be positive!")
+        self.ring = ring
+        self.every = every
+        self.filename = filename
+        shape = (capacity, dim + 1, dim)
+        if filename is None:
+            self._data = np.empty(shape)
+        else:
+            self._data = np.lib.format.open_memmap(filename, mode='w+', dtype=float, shape=shape)
+        self._stored = 0
+        self._offered = 0
+        self._last_skipped = False
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def steps(self) -> int:
+        """Number of offered snapshots, including the ones skipped by decimation."""
+        return self._offered
+
+    def record(self, simplex_x: np.ndarray) -> None:
+        """
+        Offer a snapshot of the simplex, it is stored only on every `every`-th call.
+
+        :param simplex_x: (n+1, n) array of the simplex vertices
+        """
+        step = self._offered
+        self._offered += 1
+        self._last_skipped = step % self.every != 0
+        if not self._last_skipped:
+            self._store(simplex_x)
+
+    def record_final(self, simplex_x: np.ndarray) -> None:
+        """
+        Store the final snapshot of the simplex if it was skipped by decimation.
+
+        :param simplex_x: (n+1, n) array of the simplex vertices
+        """
+        if self._last_skipped:
+            self._store(simplex_x)
+            self._last_skipped = False
+        if self.filename is not None:
+            self._data.flush()
+
+    def _store(self, simplex_x: np.ndarray) -> None:
+        if self._stored >= self.capacity and not self.ring:
+            if self.filename is not None:
+                raise ValueError("History capacity exceeded. Increase capacity or use ring or decimation mode!")
+            # In-memory buffer grows geometrically, so the amortised cost of a snapshot stays O(1)
+            grown = np.empty((2 * self.capacity, *self._data.shape[1:]))
+            grown[:self.capacity] = self._data
+            self._data = grown
+        self._data[self._stored % self.capacity] = simplex_x
+        self._stored += 1
+
+    def as_array(self) -> np.ndarray:
+        """
+        Return stored snapshots in chronological order.
+
+        :return: (k, n+1, n) array, a view of the buffer unless the ring buffer has wrapped around
+        """
+        if self._stored <= self.capacity:
+            return self._data[:self._stored]
+        start = self._stored % self.capacity
+        return np.concatenate((self._data[start:], self._data[:start]))
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        array = self.as_array()
+        return array if dtype is None else array.astype(dtype)
+
+    def __len__(self) -> int:
+        return min(self._stored, self.capacity)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (int, np.integer)) and self._stored > self.capacity:
+            if not -len(self) <= idx < len(self):
+                raise IndexError("History index out of range.")
+            return self._data[(self._stored + idx % len(self)) % self.capacity]
+        return self.as_array()[idx]
+
+    def __iter__(self):
+        return iter(self.as_array())
+
+
 # ######### Implementation of Nelder-Maed algorithm ##########
 # Implement functions below so that tests are able to pass.
 # ############################################################
@@ -74,22 +451,40 @@ def rosenbrock_function(x: np.ndarray) -> float:
     """
     Rosenbrock function implementation.
 
-    :param x: input parameters vector
+    :param x: input parameters vector of any dimension or stacked coordinates, e.g. a meshgrid
+        or an (n, k) array of k points
 
     :return: value of bird function for given input
     """
-    x1, x2 = x
-    return (1-x1)**2 + 100*(x2-x1**2)**2
+    x = np.asarray(x)
+    return np.sum((1-x[:-1])**2 + 100*(x[1:]-x[:-1]**2)**2, axis=0)
+
+
+def adaptive_parameters(dim: int) -> Tuple[float, float, float, float]:
+    """
+    Get dimension-adaptive parameters of the Nelder-Mead algorithm (Gao and Han, 2012).
+
+    For 2D space they are equal to the standard parameters, for higher dimensions expansion and shrink
+    are milder, which keeps the simplex from degenerating.
+
+    :param dim: dimension of the optimised space
+
+    :return: alpha, gamma, beta and sigma parameters
+    """
+    dim = max(dim, 2)
+    return 1., 1. + 2. / dim, 0.75 - 1. / (2. * dim), 1. - 1. / dim
 
 
-def get_centroid(x_1: np.ndarray, x_2: np.ndarray) -> np.ndarray:
+def get_centroid(x_1: np.ndarray, x_2: np.ndarray, *points: np.ndarray) -> np.ndarray:
     """
     Get coordinates of the centroid computed from simplex points.
 
-    :param simplex_x: three points of the 2D space
+    :param x_1: first point of the simplex except the worst one
+    :param x_2: second point of the simplex except the worst one
+    :param points: remaining points of the simplex except the worst one (n-dimensional simplices)
     :return: coordinates of the centroid
     """
-    return (x_1 + x_2) / 2  # Average of two points, so the middle between them.
+    return np.mean([x_1, x_2, *points], axis=0)
 
 
 def reflect(point: np.ndarray, centroid: np.ndarray, alpha: float) -> np.ndarray:
@@ -157,16 +552,134 @@ def shrink(simplex: np.ndarray, sigma: float) -> np.ndarray:
         raise ValueError("Invalid value of sigma parameter. Sigma must be in range (0,1)!")
 
 
+def apply_bounds(points: np.ndarray, bounds: np.ndarray, mode: str = "project") -> np.ndarray:
+    """
+    Move points into the box defined by bounds.
+
+    :param points: point or array of points
+    :param bounds: (n, 2) array of lower and upper bounds of each coordinate
+    :param mode: "project" clips coordinates to the bounds, "reflect" mirrors them at the violated bound
+        (infinite bounds, e.g. x >= 0 only, are never violated)
+
+    :return: points inside the box
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    lower, upper = bounds[:, 0], bounds[:, 1]
+    if mode == "project":
+        return np.clip(points, lower, upper)
+    elif mode == "reflect":
+        points = np.asarray(points, dtype=float)
+        has_lower, has_upper = np.isfinite(lower), np.isfinite(upper)
+        finite_lower = np.where(has_lower, lower, 0.)
+        finite_upper = np.where(has_upper, upper, 0.)
+        # Box in both directions: fold the coordinate into the period of two widths
+        width = finite_upper - finite_lower
+        folding = has_lower & has_upper & (width > 0)
+        safe_width = np.where(folding, width, 1.)
+        folded = np.mod(points - finite_lower, 2 * safe_width)
+        boxed = finite_lower + np.where(folded > safe_width, 2 * safe_width - folded, folded)
+        # One-sided bounds: mirror only at the violated finite bound
+        mirrored = np.where(has_lower & (points < finite_lower), 2 * finite_lower - points, points)
+        mirrored = np.where(has_upper & (mirrored > finite_upper), 2 * finite_upper - mirrored, mirrored)
+        return np.where(folding, boxed, np.where(has_lower & has_upper, finite_lower, mirrored))
+    else:
+        raise ValueError("Invalid bound handling mode. Mode must be one of: project, reflect!")
+
+
+class StepCandidates:
+    """Candidate points of a single Nelder-Mead iteration with values evaluated on demand or all at once."""
+
+    REFLECTED, EXPANDED, CONTRACTED_OUTSIDE, CONTRACTED_INSIDE = range(4)
+
+    def __init__(
+        self, simplex: SimplexND, centroid: np.ndarray, alpha: float, gamma: float, beta: float,
+        batch: bool = False, executor: Optional[Executor] = None,
+        bounds: Optional[np.ndarray] = None, bound_handling: str = "project"
+    ) -> None:
+        """
+        Initialise the object.
+
+        :param simplex: current simplex
+        :param centroid: centroid of a simplex
+        :param alpha: reflection scale
+        :param gamma: expansion scale
+        :param beta: contraction scale
+        :param batch: evaluate all candidates in a single call of the objective function, defaults to False
+        :param executor: executor evaluating all candidates speculatively and concurrently, defaults to None
+        :param bounds: (n, 2) array of box bounds the candidates are moved into, defaults to None
+        :param bound_handling: how candidates are moved into the bounds, "project" or "reflect", defaults to "project"
+        """
+        reflected = reflect(simplex.worst_point_x, centroid, alpha)
+        self.x = np.vstack([
+            reflected,
+            expand(reflected, centroid, gamma),
+            contract(reflected, centroid, beta),
+            contract(simplex.worst_point_x, centroid, beta),
+        ])
+        if bounds is not None:
+            self.x = apply_bounds(self.x, bounds, bound_handling)
+        self._simplex = simplex
+        self._y = list(simplex.evaluate_many(self.x)) if batch else [None] * len(self.x)
+        self._futures = {}
+        if executor is not None and not batch:
+            self._futures = {idx: simplex.submit(executor, point) for idx, point in enumerate(self.x)}
+
+    def y(self, idx: int) -> float:
+        """
+        Get value of the objective function for the candidate, evaluating it (or waiting for it) if needed.
+
+        :param idx: index of the candidate
+
+        :return: value of the objective function
+        """
+        if self._y[idx] is None:
+            if idx in self._futures:
+                future, memoise = self._futures.pop(idx)
+                self._y[idx] = future.result()
+                if memoise:
+                    self._simplex.memoise(self.x[idx], self._y[idx])
+            else:
+                self._y[idx] = self._simplex.evaluate(self.x[idx])
+        return self._y[idx]
+
+    def cancel(self) -> None:
+        """
+        Cancel evaluations of the candidates which turned out to be unneeded.
+
+        Values of evaluations which already finished are memoised, these and the evaluations still running
+        are counted in speculative_evaluations of a CachedObjective.
+        """
+        objective = self._simplex.objective_function
+        for idx, (future, memoise) in self._futures.items():
+            if future.cancel() or not memoise or not isinstance(objective, CachedObjective):
+                continue
+            if future.done() and future.exception() is None:
+                objective.put(self.x[idx], future.result(), speculative=True)
+            else:
+                objective.speculative_evaluations += 1
+        self._futures.clear()
+
+
 def run_nelder_mead(
-    simplex: Simplex2D,
+    simplex: SimplexND,
     alpha: float = 1.,
     gamma: float = 2.,
     beta: float = 0.5,
     sigma: float = 0.5,
-    max_iter: int = 1000
-) -> List[np.ndarray]:
+    max_iter: int = 1000,
+    xtol: float = 1e-8,
+    ftol: float = 1e-12,
+    adaptive: bool = False,
+    verbose: bool = False,
+    history: Optional[SimplexHistory] = None,
+    callback: Optional[Callable[[SimplexND], bool]] = None,
+    executor: Optional[Executor] = None,
+    bounds: Optional[np.ndarray] = None,
+    bound_handling: str = "project"
+) -> Tuple[np.ndarray, SimplexHistory]:
     """
-    Runs Nelder-Mead algorithm for optimization. Simplex2D class allows convenient parameters access and handles vertices sorting.
+    Runs Nelder-Mead algorithm for optimization. SimplexND class (or Simplex2D) allows convenient parameters access
+    and keeps vertices sorted.
 
     :param simplex: initial simplex
     :param objective_function: function to minimize
@@ -175,95 +688,496 @@ def run_nelder_mead(
     :param beta: contraction scale, defaults to 0.5
     :param sigma: shrink scale, defaults to 0.5
     :param max_iter: max number of process iteration, defaults to 1000
+    :param xtol: stop when the simplex diameter drops below this value (together with ftol), defaults to 1e-8
+    :param ftol: stop when the spread of function values drops below this value (together with xtol), defaults to 1e-12
+    :param adaptive: use dimension-adaptive parameters instead of alpha, gamma, beta and sigma, defaults to False
+    :param verbose: print the simplex on every iteration, defaults to False
+    :param history: recorder of the simplex snapshots, defaults to an in-memory SimplexHistory storing every step
+    :param callback: function called with the simplex on every iteration, returning True aborts the run, defaults to None
+    :param executor: executor (e.g. ThreadPoolExecutor for slow simulations) evaluating the reflected, expanded
+        and both contracted points concurrently on every iteration, unneeded evaluations are cancelled
+        (or memoised and counted in speculative_evaluations of a CachedObjective if already running), defaults to None
+    :param bounds: (n, 2) array of lower and upper bounds of each coordinate, defaults to None
+    :param bound_handling: how points are moved into the bounds, "project" or "reflect", defaults to "project"
 
     :return: the best point found in the optimization process and simplex history
     """
-    # Order vertices w.r.p. their function values
-    simplex_history = [simplex.x]
+    if adaptive:
+        alpha, gamma, beta, sigma = adaptive_parameters(simplex.dim)
+
+    if bounds is not None:
+        bounds = np.asarray(bounds, dtype=float)
+        if np.any(apply_bounds(simplex.x, bounds, bound_handling) != simplex.x):
+            simplex.x = apply_bounds(simplex.x, bounds, bound_handling)
+
+    # Vertices are already ordered w.r.p. their function values
+    if history is None:
+        history = SimplexHistory(simplex.dim, capacity=min(max_iter + 1, 1024))
+    history.record(simplex.x)
 
     for _ in range(max_iter):
-        print(f"Current simplex coords: {simplex.x.tolist()}")
+        if verbose:
+            print(f"Current simplex coords: {simplex.x.tolist()}")
+
+        # Stop as soon as the simplex collapsed both in the domain and in the function values
+        if simplex.spread() <= ftol and simplex.diameter() <= xtol:
+            break
+        if callback is not None and callback(simplex):
+            break
 
         # Calculate centroid (all points except worst one)
         # and reference points from the simplex - best, 2nd best, worst
-        centroid = get_centroid(x_1=simplex.best_point_x, x_2=simplex.middle_point_x)
+        centroid = simplex.centroid()
 
-        # Reflect the worst point about the centroid and evaluate with the objective function
-        reflected_point_x = reflect(simplex.worst_point_x, centroid, alpha)
-        reflected_point_y = simplex.objective_function(reflected_point_x)
+        # Reflect the worst point about the centroid and evaluate with the objective function,
+        # for vectorized objectives all candidate points of the iteration are evaluated in one call,
+        # with an executor all of them are evaluated speculatively in parallel
+        candidates = StepCandidates(
+            simplex, centroid, alpha, gamma, beta,
+            batch=simplex.vectorized, executor=executor, bounds=bounds, bound_handling=bound_handling
+        )
+        reflected_point_y = candidates.y(StepCandidates.REFLECTED)
 
         # Reflected point is better than 2nd worst point
         if reflected_point_y < simplex.middle_point_y:
             if reflected_point_y < simplex.best_point_y:
                 # If the reflection gives a better result than the current best,
                 # try an expansion in that direction.
-                expanded_point_x = expand(reflected_point_x, centroid, gamma)
-                expanded_point_y = simplex.objective_function(expanded_point_x)
+                expanded_point_y = candidates.y(StepCandidates.EXPANDED)
                 # Replace the worst point with the better one from {expanded, reflected}
                 if expanded_point_y < reflected_point_y:
-                    simplex.x = [simplex.best_point_x, simplex.middle_point_x, expanded_point_x]
+                    simplex.replace_worst(candidates.x[StepCandidates.EXPANDED], expanded_point_y)
                 else:
-                    simplex.x = [simplex.best_point_x, simplex.middle_point_x, reflected_point_x]
+                    simplex.replace_worst(candidates.x[StepCandidates.REFLECTED], reflected_point_y)
             else:
                 # If reflected point is better than 2nd worst but not than the best -
                 # replace the worst simplex point
-                simplex.x = [simplex.best_point_x, simplex.middle_point_x, reflected_point_x]
+                simplex.replace_worst(candidates.x[StepCandidates.REFLECTED], reflected_point_y)
         else:
             # Compute contraction using the worse of {reflected, worst simplex point}
             if reflected_point_y < simplex.worst_point_y:
-                contracted_point = contract(reflected_point_x, centroid, beta)
+                contracted_idx = StepCandidates.CONTRACTED_OUTSIDE
             else:
-                contracted_point = contract(simplex.worst_point_x, centroid, beta)
-            contracted_point_value = simplex.objective_function(contracted_point)
+                contracted_idx = StepCandidates.CONTRACTED_INSIDE
+            contracted_point_value = candidates.y(contracted_idx)
             # If contraction helps - replace the worst point; oth. shrink towards best point
             if contracted_point_value < simplex.worst_point_y:
-                simplex.x = [simplex.best_point_x, simplex.middle_point_x, contracted_point]
+                simplex.replace_worst(candidates.x[contracted_idx], contracted_point_value)
             else:
-                # Shrinking replaces all points except the best one
-                simplex.x = shrink(simplex.x, sigma)
+                # Shrinking replaces all points except the best one, evaluated in one call if vectorized,
+                # unneeded candidates are cancelled first so the shrink evaluations do not queue behind them
+                candidates.cancel()
+                simplex.shrink_towards_best(sigma, executor)
+        candidates.cancel()
+
+        # Vertices are kept sorted w.r.p. their function values, store a snapshot of the simplex
+        history.record(simplex.x)
+
+    history.record_final(simplex.x)
+    optimal_point = simplex.best_point_x.copy()
+    return optimal_point, history
+
+
+# ########## Constrained Nelder-Mead ##########
+
+class ConstrainedObjective:
+    """
+    A wrapper of the objective function handling inequality constraints constr(x) >= 0.
+
+    Constraints are checked before the objective function, so with the extreme barrier
+    infeasible points are rejected without the (possibly expensive) evaluation.
+    """
+
+    def __init__(
+        self, objective_function: Callable, constraints: Sequence[Callable], method: str = "barrier",
+        penalty: float = 10., vectorized: bool = False
+    ) -> None:
+        """
+        Initialise the object.
+
+        :param objective_function: objective function to wrap
+        :param constraints: functions which are non-negative for feasible points
+        :param method: "barrier" returns infinity for infeasible points, "penalty" adds penalty times
+            the squared constraints violation, defaults to "barrier"
+        :param penalty: weight of the constraints violation, defaults to 10.
+        :param vectorized: the objective function takes an (n, k) array of stacked coordinates and returns k values,
+            defaults to False
+        """
+        if method not in ("barrier", "penalty"):
+            raise ValueError("Invalid constraint handling method. Method must be one of: barrier, penalty!")
+        self.objective_function = objective_function
+        self.constraints = list(constraints)
+        self.method = method
+        self.penalty = penalty
+        self.vectorized = vectorized
+        self.evaluations = 0
+        self.skipped = 0
+
+    def violation(self, x: np.ndarray) -> float:
+        """
+        Get the squared violation of the constraints.
+
+        :param x: input parameters vector
+
+        :return: sum of squared negative parts of the constraints, 0 for feasible points
+        """
+        return float(sum(min(constr(x), 0.) ** 2 for constr in self.constraints))
+
+    def __call__(self, x: np.ndarray) -> float:
+        """
+        Return the (penalised) value of the objective function.
+
+        :param x: input parameters vector, or an (n, k) array of stacked coordinates if the objective is vectorized
+
+        :return: value of the objective function for given input
+        """
+        x = np.asarray(x, dtype=float)
+        if self.vectorized and x.ndim == 2:
+            violations = np.array([self.violation(point) for point in x.T])
+            values = np.full(len(violations), np.inf)
+            evaluated = violations == 0 if self.method == "barrier" else np.ones(len(violations), dtype=bool)
+            if np.any(evaluated):
+                values[evaluated] = self.objective_function(x[:, evaluated]) + self.penalty * violations[evaluated]
+            self.evaluations += int(np.sum(evaluated))
+            self.skipped += int(np.sum(~evaluated))
+            return values
+        violation = self.violation(x)
+        if self.method == "barrier" and violation > 0:
+            self.skipped += 1
+            return np.inf
+        self.evaluations += 1
+        return self.objective_function(x) + self.penalty * violation
+
+
+def run_constrained_nelder_mead(
+    objective_function: Callable,
+    x_0: np.ndarray,
+    constraints: Sequence[Callable] = (),
+    bounds: Optional[np.ndarray] = None,
+    method: str = "barrier",
+    bound_handling: str = "project",
+    penalty: float = 10.,
+    penalty_growth: float = 10.,
+    max_restarts: int = 10,
+    constraint_tol: float = 1e-10,
+    **kwargs
+) -> Tuple[np.ndarray, ConstrainedObjective]:
+    """
+    Runs Nelder-Mead algorithm with box bounds and inequality constraints.
+
+    The algorithm is restarted from the best point found. With the penalty method the penalty grows on every restart
+    until the constraints are satisfied, with the barrier method restarts stop when the best point does not move.
+
+    :param objective_function: function to minimize
+    :param x_0: starting point, has to be feasible for the barrier method
+    :param constraints: functions which are non-negative for feasible points, defaults to ()
+    :param bounds: (n, 2) array of lower and upper bounds of each coordinate, defaults to None
+    :param method: "barrier" or "penalty", defaults to "barrier"
+    :param bound_handling: how points are moved into the bounds, "project" or "reflect", defaults to "project"
+    :param penalty: initial weight of the constraints violation, defaults to 10.
+    :param penalty_growth: factor the penalty is multiplied by on every restart, defaults to 10.
+    :param max_restarts: max number of restarts, defaults to 10
+    :param constraint_tol: accepted squared constraints violation, defaults to 1e-10
+    :param kwargs: other parameters passed to run_nelder_mead
+
+    :return: the best point found and the wrapped objective with evaluation statistics
+    """
+    objective = ConstrainedObjective(objective_function, constraints, method, penalty)
+    point = np.asarray(x_0, dtype=float)
+    if bounds is not None:
+        point = apply_bounds(point, np.asarray(bounds, dtype=float), bound_handling)
+    if method == "barrier" and objective.violation(point) > 0:
+        raise ValueError("Invalid starting point. Starting point must be feasible for the barrier method!")
+
+    for _ in range(max_restarts + 1):
+        # A new simplex wraps the objective in a new cache, so values memoised with the old penalty are dropped
+        simplex = SimplexND(initial_simplex(point, bounds=bounds), objective)
+        history = SimplexHistory(simplex.dim, capacity=1, ring=True)
+        new_point, _ = run_nelder_mead(
+            simplex, history=history, bounds=bounds, bound_handling=bound_handling, **kwargs
+        )
+        converged = np.allclose(new_point, point, rtol=0., atol=kwargs.get("xtol", 1e-8))
+        point = new_point
+        if method == "penalty":
+            if objective.violation(point) <= constraint_tol:
+                break
+            objective.penalty *= penalty_growth
+        elif converged:
+            break
+    return point, objective
+
+
+# ########## Multi-start Nelder-Mead ##########
+
+@dataclass
+class StartStatistics:
+    """Outcome of a single run of the multi-start optimisation."""
+    start_point: np.ndarray
+    best_point: np.ndarray
+    best_value: float
+    iterations: int
+    evaluations: int    # Including speculative evaluations of an executor
+    wall_time: float
+    aborted: bool
+
+
+@dataclass
+class MultiStartResult:
+    """Best point found by the multi-start optimisation with statistics of all runs."""
+    best_point: np.ndarray
+    best_value: float
+    starts: List[StartStatistics]
+
+
+def sample_start_points(n_starts: int, bounds: np.ndarray, method: str = "lhs", seed: Optional[int] = None) -> np.ndarray:
+    """
+    Sample start points spread evenly over the box with a quasi-random design.
+
+    :param n_starts: number of start points
+    :param bounds: (n, 2) array of lower and upper bounds of each coordinate
+    :param method: "lhs" for Latin hypercube or "sobol" for Sobol sequence, defaults to "lhs"
+    :param seed: seed of the random generator, defaults to None
+
+    :return: (n_starts, n) array of start points
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    if method == "lhs":
+        sampler = qmc.LatinHypercube(d=bounds.shape[0], seed=seed)
+    elif method == "sobol":
+        sampler = qmc.Sobol(d=bounds.shape[0], seed=seed)
+    else:
+        raise ValueError("Invalid sampling method. Method must be one of: lhs, sobol!")
+    return qmc.scale(sampler.random(n_starts), bounds[:, 0], bounds[:, 1])
+
+
+def initial_simplex(point: np.ndarray, step: float = 0.05, bounds: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Build an initial simplex around the point by perturbing each coordinate in turn.
+
+    A perturbation leaving the bounds is taken in the other direction, or halfway to the farther bound
+    if the box is narrower than the step, so a start on a bound does not collapse when projected.
+
+    :param point: first vertex of the simplex
+    :param step: relative perturbation of the coordinates (absolute for zero coordinates), defaults to 0.05
+    :param bounds: (n, 2) array of lower and upper bounds of each coordinate, defaults to None
+
+    :return: (n+1, n) array of the simplex vertices
+    """
+    point = np.asarray(point, dtype=float)
+    perturbation = np.where(point != 0, step * point, step)
+    if bounds is not None:
+        lower, upper = np.asarray(bounds, dtype=float).T
+        room_up, room_down = upper - point, point - lower
+        perturbation = np.where(
+            (perturbation <= room_up) & (-perturbation <= room_down), perturbation,
+            np.where((-perturbation <= room_up) & (perturbation <= room_down), -perturbation,
+                     np.where(room_up >= room_down, room_up, -room_down) / 2)
+        )
+    return np.vstack([point, point + np.diag(perturbation)])
+
+
+_abort_event = None
 
-        # Re-sort simplex w.r.p. their function values
-        simplex_history.append(simplex.x)
 
-    optimal_point = simplex_history[-1][0]
-    return optimal_point, simplex_history
+def _init_multistart_worker(abort_event) -> None:
+    """Store the event shared by all workers of the pool."""
+    global _abort_event
+    _abort_event = abort_event
+
+
+def _run_single_start(args: tuple) -> StartStatistics:
+    """Run Nelder-Mead from a single start point, aborting when any worker has reached the target value."""
+    start_point, objective_function, target_value, kwargs = args
+    if _abort_event.is_set():
+        return StartStatistics(start_point, start_point, np.inf, 0, 0, 0.0, True)
+    start_time = time.perf_counter()
+    aborted = False
+
+    def callback(simplex: SimplexND) -> bool:
+        nonlocal aborted
+        if target_value is not None and simplex.best_point_y <= target_value:
+            _abort_event.set()
+            return True
+        aborted = _abort_event.is_set()
+        return aborted
+
+    simplex = SimplexND(initial_simplex(start_point, bounds=kwargs.get("bounds")), objective_function)
+    history = SimplexHistory(simplex.dim, capacity=1, ring=True)
+    best_point, history = run_nelder_mead(simplex, history=history, callback=callback, **kwargs)
+    return StartStatistics(
+        start_point=start_point,
+        best_point=best_point,
+        best_value=float(simplex.best_point_y),
+        iterations=history.steps - 1,
+        evaluations=getattr(simplex.objective_function, "evaluations", 0)
+        + getattr(simplex.objective_function, "speculative_evaluations", 0),
+        wall_time=time.perf_counter() - start_time,
+        aborted=aborted,
+    )
+
+
+def run_multistart_nelder_mead(
+    objective_function: Callable,
+    bounds: np.ndarray,
+    n_starts: int = 64,
+    method: str = "lhs",
+    target_value: Optional[float] = None,
+    n_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    **kwargs
+) -> MultiStartResult:
+    """
+    Runs Nelder-Mead algorithm from many start points in parallel worker processes.
+
+    :param objective_function: function to minimize, must be picklable (i.e. defined at module level)
+    :param bounds: (n, 2) array of lower and upper bounds of the region of start points
+    :param n_starts: number of start points, defaults to 64
+    :param method: sampling of start points, "lhs" or "sobol", defaults to "lhs"
+    :param target_value: abort all runs once any of them reaches this value, defaults to None
+    :param n_workers: number of worker processes, 1 runs in the current process, defaults to number of cores
+    :param seed: seed of the start points sampling, defaults to None
+    :param kwargs: other parameters passed to run_nelder_mead
+
+    :return: the best point found together with statistics of every start
+    """
+    start_points = sample_start_points(n_starts, bounds, method, seed)
+    tasks = [(point, objective_function, target_value, kwargs) for point in start_points]
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        _init_multistart_worker(multiprocessing.Event())
+        try:
+            starts = [_run_single_start(task) for task in tasks]
+        finally:
+            _init_multistart_worker(None)
+    else:
+        abort_event = multiprocessing.get_context().Event()
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, n_starts),
+            initializer=_init_multistart_worker,
+            initargs=(abort_event,),
+        ) as executor:
+            starts = list(executor.map(_run_single_start, tasks))
+    best_start = min(starts, key=lambda start: start.best_value)
+    return MultiStartResult(best_start.best_point, best_start.best_value, starts)
 
 
 # ########## Visualisation functions ############
 
-def get_canvas_range(simplex_history: List[np.ndarray], padding: float = 2) -> np.ndarray:
-    reshaped_points = np.array(simplex_history).reshape(-1, 2)
-    min_x = min(reshaped_points[:, 0]) - padding
-    max_x = max(reshaped_points[:, 0]) + padding
-    min_y = min(reshaped_points[:, 1]) - padding
-    max_y = max(reshaped_points[:, 1]) + padding
+def get_canvas_range(simplex_history: SimplexHistory, padding: float = 2) -> np.ndarray:
+    reshaped_points = np.asarray(simplex_history).reshape(-1, 2)
+    min_x, min_y = reshaped_points.min(axis=0) - padding
+    max_x, max_y = reshaped_points.max(axis=0) + padding
     return np.array([min_x, max_x, min_y, max_y])
 
+
+@lru_cache(maxsize=8)
+def _evaluate_grid(
+    objective_func: Callable, canvas_range: Tuple[float, float, float, float], num: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Evaluate the objective function on a meshgrid, cached per (objective, canvas range, resolution)."""
+    x1_range = np.linspace(canvas_range[0], canvas_range[1], num=num)
+    x2_range = np.linspace(canvas_range[2], canvas_range[3], num=num)
+    grid_x1, grid_x2 = np.meshgrid(x1_range, x2_range)
+    obj = objective_func([grid_x1, grid_x2])
+    for array in (grid_x1, grid_x2, obj):
+        array.setflags(write=False)
+    return grid_x1, grid_x2, obj
+
+
+def decimate_history(simplex_history: np.ndarray, max_simplices: int) -> np.ndarray:
+    """
+    Select evenly spaced snapshots of a long simplex history, always keeping the first and the last one.
+
+    :param simplex_history: (k, n+1, n) array of simplex snapshots
+    :param max_simplices: max number of snapshots to keep
+
+    :return: decimated (m, n+1, n) array of snapshots, m <= max_simplices
+    """
+    if len(simplex_history) <= max_simplices:
+        return simplex_history
+    indices = np.unique(np.linspace(0, len(simplex_history) - 1, num=max_simplices).astype(int))
+    return simplex_history[indices]
+
+
+def _draw_history_fast(ax: plt.Axes, simplex_history: np.ndarray, max_simplices: int) -> None:
+    """Draw simplex history with a single scatter per marker style and a single LineCollection of edges."""
+    initial_simplex, final_simplex = simplex_history[0], simplex_history[-1]
+    simplex_history = decimate_history(simplex_history, max_simplices)
+
+    # Edges between consecutive vertices of every simplex, fading in with the iteration
+    segments = np.stack((simplex_history, np.roll(simplex_history, -1, axis=1)), axis=2).reshape(-1, 2, 2)
+    colors = np.ones((len(segments), 4))
+    colors[:, 3] = np.repeat(0.1 + 0.9*np.arange(len(simplex_history))/len(simplex_history), simplex_history.shape[1])
+    ax.add_collection(LineCollection(segments, colors=colors, linewidths=0.7))
+
+    # Intermediate points, each drawn once
+    intermediate_points = np.unique(simplex_history[1:-1].reshape(-1, 2), axis=0)
+    ax.scatter(intermediate_points[:, 0], intermediate_points[:, 1], marker='o', color='gray', edgecolors='black', s=49, alpha=0.7)
+    ax.scatter(initial_simplex[:, 0], initial_simplex[:, 1], marker='d', color='gray', edgecolors='black', s=49)
+    ax.scatter(final_simplex[:, 0], final_simplex[:, 1], marker='o', color='white', edgecolors='black', s=100, alpha=0.7)
+    ax.scatter(final_simplex[0, 0], final_simplex[0, 1], marker='h', color='white', edgecolors='black', s=144)
+
+
 def visualise_nelder_mead_optimisation(
-    simplex_history: List[np.ndarray],
+    simplex_history: SimplexHistory,
     objective_func: Callable,
-    canvas_range: Tuple[float, float, float, float]
-):
-    """Visualise optimisation of an objective function with Nelder-Mead algorithm."""
-    
-    # Convert points in simplex history from nupny arrays to tuples
-    simplex_history = [[tuple(point) for point in simplex] for simplex in simplex_history]
+    canvas_range: Tuple[float, float, float, float],
+    fast: bool = False,
+    grid_size: Optional[int] = None,
+    max_simplices: int = 2000
+) -> plt.Figure:
+    """
+    Visualise optimisation of an objective function with Nelder-Mead algorithm.
 
-    # Extract simplex history elements
-    initial_simplex = simplex_history[0]
-    final_simplex = simplex_history[-1]
-    optimal_point = final_simplex[0]
+    :param simplex_history: simplex snapshots recorded during optimisation
+    :param objective_func: optimised objective function
+    :param canvas_range: range of the canvas as (min_x, max_x, min_y, max_y)
+    :param fast: draw all points with single scatter calls and all edges with a single LineCollection,
+        decimating long histories, defaults to False
+    :param grid_size: resolution of the contour grid, defaults to 1000 (300 in fast mode)
+    :param max_simplices: max number of drawn snapshots in fast mode, defaults to 2000
 
-    # Prepare manifold according to given ranges
-    x1_range = np.linspace(canvas_range[0], canvas_range[1], num=1000)
-    x2_range = np.linspace(canvas_range[2], canvas_range[3], num=1000)
-    grid_x1, grid_x2 = np.meshgrid(x1_range, x2_range)
-    obj = objective_func([grid_x1, grid_x2])
+    :return: figure with the visualisation
+    """
+    if grid_size is None:
+        grid_size = 300 if fast else 1000
+
+    # Prepare manifold according to given ranges, evaluated once per objective and canvas range
+    grid_x1, grid_x2, obj = _evaluate_grid(objective_func, tuple(float(bound) for bound in canvas_range), grid_size)
 
     # Prepare canvas
     fig, ax = plt.subplots(figsize=(8, 8))
     cplot = ax.contourf(grid_x1, grid_x2, obj, 10, cmap='Spectral_r', alpha=1)
     clines = ax.contour(grid_x1, grid_x2, obj, 10, colors='black')
+
+    if fast:
+        _draw_history_fast(ax, np.asarray(simplex_history), max_simplices)
+    else:
+        _draw_history(ax, simplex_history)
+
+    # Adjust canvas
+    ax.set_aspect('equal')
+    ax.set_xlabel(r'$x_1$', fontsize=16)
+    ax.set_ylabel(r'$x_2$', fontsize=16)
+    ax.clabel(clines)
+
+    # Plot figure
+    plt.tight_layout(pad=5)
+    plt.suptitle("Process of optimization using Nelder-Mead algorithm.")
+    plt.show()
+    return fig
+
+
+def _draw_history(ax: plt.Axes, simplex_history: SimplexHistory) -> None:
+    """Draw simplex history point by point and edge by edge."""
+
+    # Convert points in simplex history from nupny arrays to tuples
+    simplex_history = [[tuple(point) for point in simplex] for simplex in simplex_history]
+
+    # Extract simplex history elements
+    initial_simplex = simplex_history[0]
+    final_simplex = simplex_history[-1]
+    optimal_point = final_simplex[0]
     
     # Set of already plotted points
     visited_points = set()
@@ -297,17 +1211,6 @@ def visualise_nelder_mead_optimisation(
             alpha = 0.1 + 0.9*(i/len(simplex_history))
             ax.plot((p1[0], p2[0]), (p1[1], p2[1]), color='white', linewidth=0.7, alpha=alpha)
 
-    # Adjust canvas
-    ax.set_aspect('equal')
-    ax.set_xlabel(r'$x_1$', fontsize=16)
-    ax.set_ylabel(r'$x_2$', fontsize=16)
-    ax.clabel(clines)
-
-    # Plot figure
-    plt.tight_layout(pad=5)
-    plt.suptitle("Process of optimization using Nelder-Mead algorithm.")
-    plt.show()
-
 
 # ########## Entrypoint to the task ##############
 # Run this script as an entrypoint to see results
@@ -335,6 +1238,7 @@ if __name__ == "__main__":
         gamma=gamma,
         sigma=sigma,
         max_iter=max_iter,
+        verbose=True,
     )
     optimal_point_val = objective_function(optimal_point)
     canvas_range = get_canvas_range(simplex_history)
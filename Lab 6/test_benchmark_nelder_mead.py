@@ -0,0 +1,37 @@
+"""Testing script for the benchmark."""
+
+import json
+
+import numpy as np
+import pytest
+
+from benchmark_nelder_mead import (
+    ackley_function, find_regressions, rastrigin_function, run_benchmark, save_report
+)
+
+
+@pytest.mark.parametrize("func", [rastrigin_function, ackley_function])
+def test_benchmark_function_minimum(func):
+    np.testing.assert_almost_equal(func(np.zeros(5)), 0.)
+    assert func(np.ones(5)) > 0
+
+
+def test_run_benchmark(tmp_path):
+    rows = run_benchmark(dims=(2,), functions=("sphere",), max_iter_per_dim=500)
+    assert len(rows) == 4
+    assert {row["solver"] for row in rows} == {"own", "scipy"}
+    for row in rows:
+        assert row["final_error"] < 1e-6
+        assert row["evaluations_to_tol"] <= row["evaluations"]
+
+    save_report(rows, str(tmp_path / "report.json"))
+    save_report(rows, str(tmp_path / "report.csv"))
+    with open(tmp_path / "report.json") as file:
+        assert json.load(file) == rows
+
+
+def test_find_regressions():
+    baseline = [{"function": "sphere", "dim": 2, "solver": "own", "adaptive": False, "evaluations": 100, "wall_time": 1.}]
+    rows = [dict(baseline[0], evaluations=150)]
+    assert find_regressions(baseline, rows) == rows
+    assert find_regressions(baseline, baseline) == []
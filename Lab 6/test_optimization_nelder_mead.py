@@ -1,9 +1,17 @@
 """Testing script for the task."""
 
+import warnings
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
 import numpy as np
 import pytest
 
-from optimization_nelder_mead import rosenbrock_function, shrink, contract, expand, reflect, run_nelder_mead, Simplex2D
+from optimization_nelder_mead import (
+    rosenbrock_function, shrink, contract, expand, reflect, run_nelder_mead, Simplex2D, SimplexND,
+    CachedObjective, SimplexHistory, run_multistart_nelder_mead, sample_start_points,
+    adaptive_parameters, initial_simplex, apply_bounds, ConstrainedObjective, run_constrained_nelder_mead,
+    decimate_history, get_canvas_range, get_centroid, visualise_nelder_mead_optimisation
+)
 
 
 def sphere_function(x: np.ndarray) -> float:
@@ -269,3 +277,286 @@ def test_shrink(simplex, sigma, exp_val):
 def test_run_nelder_mead_rosenbrock(initial_simplex, expected_optimum):
     optimum_point, _ = run_nelder_mead(initial_simplex)
     np.testing.assert_array_almost_equal(optimum_point, expected_optimum, decimal=5)
+
+
+def test_simplex_nd_incorrect_shape():
+    with pytest.raises(ValueError) as excinfo:
+        SimplexND(np.zeros((3, 3)), sphere_function)
+    assert "Invalid simplex shape." in str(excinfo.value)
+
+
+def test_simplex_nd_replace_worst():
+    simplex = SimplexND(np.array([[3., 0.], [1., 0.], [2., 0.]]), sphere_function)
+    np.testing.assert_array_equal(simplex.y, np.array([1., 4., 9.]))
+    simplex.replace_worst(np.array([0., 1.5]), 2.25)
+    np.testing.assert_array_equal(simplex.x, np.array([[1., 0.], [0., 1.5], [2., 0.]]))
+    np.testing.assert_array_equal(simplex.y, np.array([1., 2.25, 4.]))
+    np.testing.assert_array_almost_equal(simplex.centroid(), np.array([0.5, 0.75]))
+
+
+@pytest.mark.parametrize("dim", [3, 5])
+def test_run_nelder_mead_nd(dim):
+    initial_simplex = SimplexND(np.vstack([np.full(dim, 2.), 2. + np.eye(dim)]), sphere_function)
+    optimum_point, _ = run_nelder_mead(initial_simplex, max_iter=3000)
+    np.testing.assert_array_almost_equal(optimum_point, np.zeros(dim), decimal=5)
+
+
+def test_cached_objective():
+    objective = CachedObjective(sphere_function, maxsize=2)
+    assert objective(np.array([1., 2.])) == 5.
+    assert objective(np.array([1., 2.])) == 5.
+    assert objective(np.array([0., 1.])) == 1.
+    assert objective(np.array([2., 2.])) == 8.
+    assert objective(np.array([1., 2.])) == 5.
+    assert objective.evaluations == 4
+    assert objective.hits == 1
+
+
+def test_run_nelder_mead_converges_early():
+    objective = CachedObjective(sphere_function)
+    simplex = Simplex2D([-1., -1.], [.0, 3.5], [1.5, .0], objective)
+    optimum_point, simplex_history = run_nelder_mead(simplex, max_iter=100000, xtol=1e-6, ftol=1e-10)
+    np.testing.assert_array_almost_equal(optimum_point, np.array([.0, .0]), decimal=5)
+    assert len(simplex_history) < 1000
+    assert objective.evaluations < 3 * len(simplex_history)
+
+
+@pytest.mark.parametrize(
+    "capacity, ring, every, exp_steps",
+    [
+        (2, False, 1, [0, 1, 2, 3, 4, 5, 6]),
+        (3, True, 1, [4, 5, 6]),
+        (8, False, 3, [0, 3, 6]),
+        (2, True, 2, [4, 6]),
+    ]
+)
+def test_simplex_history(capacity, ring, every, exp_steps):
+    history = SimplexHistory(dim=1, capacity=capacity, ring=ring, every=every)
+    for step in range(7):
+        history.record(np.full((2, 1), step))
+    history.record_final(np.full((2, 1), 6))
+    assert len(history) == len(exp_steps)
+    np.testing.assert_array_equal(np.asarray(history)[:, 0, 0], exp_steps)
+    np.testing.assert_array_equal(history[-1], np.full((2, 1), 6))
+    np.testing.assert_array_equal(history[0], np.full((2, 1), exp_steps[0]))
+
+
+def test_simplex_history_memmap(tmp_path):
+    filename = str(tmp_path / "history.npy")
+    simplex = Simplex2D([-1., -1.], [.0, 3.5], [1.5, .0], sphere_function)
+    history = SimplexHistory(dim=2, capacity=50, ring=True, every=10, filename=filename)
+    optimum_point, history = run_nelder_mead(simplex, max_iter=1000, history=history)
+    np.testing.assert_array_almost_equal(optimum_point, np.array([.0, .0]), decimal=5)
+    np.testing.assert_array_equal(history[-1][0], optimum_point)
+    assert np.load(filename, mmap_mode='r').shape == (50, 3, 2)
+
+
+@pytest.mark.parametrize("method", ["lhs", "sobol"])
+def test_sample_start_points(method):
+    bounds = np.array([[-2., 2.], [0., 10.]])
+    points = sample_start_points(16, bounds, method, seed=0)
+    assert points.shape == (16, 2)
+    assert np.all(points >= bounds[:, 0]) and np.all(points <= bounds[:, 1])
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_run_multistart_nelder_mead(n_workers):
+    result = run_multistart_nelder_mead(
+        rosenbrock_function, np.array([[-2., 2.], [-2., 2.]]), n_starts=4, n_workers=n_workers, seed=0
+    )
+    np.testing.assert_array_almost_equal(result.best_point, np.array([1.0, 1.0]), decimal=5)
+    assert len(result.starts) == 4
+    assert result.best_value == min(start.best_value for start in result.starts)
+
+
+def test_run_multistart_nelder_mead_target_value():
+    result = run_multistart_nelder_mead(
+        sphere_function, np.array([[-2., 2.], [-2., 2.]]), n_starts=8, target_value=1e-2, n_workers=1, seed=0
+    )
+    assert result.best_value <= 1e-2
+    assert sum(start.aborted for start in result.starts) == 7
+
+
+def test_run_nelder_mead_vectorized():
+    calls = []
+
+    def batch_rosenbrock(points):
+        calls.append(points.shape[1])
+        return rosenbrock_function(points)
+
+    objective = CachedObjective(batch_rosenbrock)
+    simplex = Simplex2D([-1.5, -1.5], [-1.0, -1.5], [-1.5, .0], objective, vectorized=True)
+    optimum_point, simplex_history = run_nelder_mead(simplex)
+    np.testing.assert_array_almost_equal(optimum_point, np.array([1.0, 1.0]), decimal=5)
+    assert calls[0] == 3
+    assert objective.calls == len(calls) <= simplex_history.steps
+
+
+@pytest.mark.parametrize(
+    "dim, exp_val",
+    [
+        (2, (1., 2., 0.5, 0.5)),
+        (10, (1., 1.2, 0.7, 0.9)),
+    ]
+)
+def test_adaptive_parameters(dim, exp_val):
+    np.testing.assert_array_almost_equal(adaptive_parameters(dim), exp_val)
+
+
+def test_rosenbrock_function_nd():
+    assert rosenbrock_function(np.ones(10)) == 0
+    np.testing.assert_array_equal(
+        rosenbrock_function([np.array([0., 1., 2.]), np.array([0., 1., 2.])]), np.array([1., 0., 401.])
+    )
+    np.testing.assert_array_equal(rosenbrock_function(np.ones((3, 4))), np.zeros(4))
+
+
+def test_run_nelder_mead_adaptive():
+    simplex = SimplexND(initial_simplex(np.full(10, 2.), step=0.5), sphere_function)
+    optimum_point, _ = run_nelder_mead(simplex, max_iter=20000, adaptive=True)
+    np.testing.assert_array_almost_equal(optimum_point, np.zeros(10), decimal=5)
+
+
+def test_run_nelder_mead_executor():
+    sequential_simplex = Simplex2D([-1.5, -1.5], [-1.0, -1.5], [-1.5, .0], rosenbrock_function)
+    sequential_point, sequential_history = run_nelder_mead(sequential_simplex)
+    objective = CachedObjective(rosenbrock_function)
+    simplex = Simplex2D([-1.5, -1.5], [-1.0, -1.5], [-1.5, .0], objective)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        optimum_point, simplex_history = run_nelder_mead(simplex, executor=executor)
+    np.testing.assert_array_equal(optimum_point, sequential_point)
+    np.testing.assert_array_equal(np.asarray(simplex_history), np.asarray(sequential_history))
+    # Memoised speculative values can spare evaluations needed later
+    assert objective.evaluations <= sequential_simplex.objective_function.evaluations
+
+
+class ImmediateExecutor(Executor):
+    """Executor running every submitted call at once, so no speculative evaluation can be cancelled."""
+
+    def __init__(self) -> None:
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def test_run_nelder_mead_executor_speculative_evaluations():
+    sequential_simplex = Simplex2D([-1.5, -1.5], [-1.0, -1.5], [-1.5, .0], rosenbrock_function)
+    sequential_point, _ = run_nelder_mead(sequential_simplex)
+    objective = CachedObjective(rosenbrock_function)
+    simplex = Simplex2D([-1.5, -1.5], [-1.0, -1.5], [-1.5, .0], objective)
+    executor = ImmediateExecutor()
+    optimum_point, _ = run_nelder_mead(simplex, executor=executor)
+    np.testing.assert_array_equal(optimum_point, sequential_point)
+    assert objective.speculative_evaluations > 0
+    assert objective.evaluations < sequential_simplex.objective_function.evaluations
+    # Every evaluation of the objective is counted once, 3 vertices are evaluated outside of the executor
+    assert objective.evaluations + objective.speculative_evaluations == executor.submitted + 3
+
+
+@pytest.mark.parametrize(
+    "mode, exp_val",
+    [
+        ("project", np.array([[0., 1.], [1., 0.5]])),
+        ("reflect", np.array([[0.5, 0.], [0.5, 0.5]])),
+    ]
+)
+def test_apply_bounds(mode, exp_val):
+    bounds = np.array([[0., 1.], [0., 1.]])
+    points = np.array([[-0.5, 2.], [1.5, 0.5]])
+    np.testing.assert_array_almost_equal(apply_bounds(points, bounds, mode), exp_val)
+
+
+def test_apply_bounds_reflect_one_sided():
+    bounds = np.array([[0., np.inf], [-np.inf, 1.], [-np.inf, np.inf], [2., 2.]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        np.testing.assert_array_equal(
+            apply_bounds(np.array([-1., 3., 5., 0.]), bounds, "reflect"), [1., -1., 5., 2.]
+        )
+        np.testing.assert_array_equal(
+            apply_bounds(np.array([[-1., 3.], [3., 0.]]), np.array([[0., np.inf], [0., np.inf]]), "reflect"),
+            [[1., 3.], [3., 0.]]
+        )
+
+
+def test_constrained_objective_skips_infeasible():
+    objective = ConstrainedObjective(sphere_function, [lambda x: 1 - x[0]])
+    assert objective(np.array([0.5, 1.])) == 1.25
+    assert objective(np.array([2., 1.])) == np.inf
+    assert objective.evaluations == 1
+    assert objective.skipped == 1
+
+
+@pytest.mark.parametrize("method, decimal", [("barrier", 3), ("penalty", 4)])
+def test_run_constrained_nelder_mead(method, decimal):
+    def shifted_sphere(x):
+        return sphere_function(np.asarray(x) - 2)
+
+    optimum_point, objective = run_constrained_nelder_mead(
+        shifted_sphere, np.array([0., 0.]), [lambda x: 2 - x[0] - x[1]], method=method, max_iter=2000
+    )
+    np.testing.assert_array_almost_equal(optimum_point, np.array([1., 1.]), decimal=decimal)
+    assert (objective.skipped > 0) == (method == "barrier")
+
+
+def test_run_constrained_nelder_mead_bounds():
+    optimum_point, _ = run_constrained_nelder_mead(
+        sphere_function, np.array([3., 3.]), bounds=np.array([[1., 4.], [-1., 4.]])
+    )
+    np.testing.assert_array_almost_equal(optimum_point, np.array([1., 0.]), decimal=5)
+
+
+@pytest.mark.parametrize("bound_handling", ["project", "reflect"])
+@pytest.mark.parametrize("x_0", [[1., 1.], [0.98, 0.], [0., 1.]])
+def test_run_constrained_nelder_mead_start_on_bound(bound_handling, x_0):
+    optimum_point, _ = run_constrained_nelder_mead(
+        lambda x: (x[0] - .5) ** 2 + (x[1] - .5) ** 2, np.array(x_0), bounds=np.array([[0., 1.], [0., 1.]]),
+        bound_handling=bound_handling
+    )
+    np.testing.assert_array_almost_equal(optimum_point, np.array([.5, .5]), decimal=5)
+
+
+def test_initial_simplex_bounds():
+    bounds = np.array([[0., 1.], [0., 1.], [-np.inf, 2.], [0.99, 1.01]])
+    simplex = initial_simplex(np.array([1., 0.5, 2., 1.]), bounds=bounds)
+    np.testing.assert_array_almost_equal(np.diag(simplex[1:] - simplex[0]), [-0.05, 0.025, -0.1, 0.005])
+    assert np.all((simplex >= bounds[:, 0]) & (simplex <= bounds[:, 1]))
+    simplex = initial_simplex(np.array([1., 0.5]))
+    np.testing.assert_array_almost_equal(np.diag(simplex[1:] - simplex[0]), [0.05, 0.025])
+
+
+def test_decimate_history():
+    history = np.arange(100).reshape(100, 1, 1)
+    decimated = decimate_history(history, 10)
+    assert len(decimated) == 10
+    assert decimated[0, 0, 0] == 0 and decimated[-1, 0, 0] == 99
+    assert decimate_history(history, 200) is history
+
+
+def test_visualise_nelder_mead_optimisation_fast():
+    simplex = Simplex2D([-1.5, -1.5], [-1.0, -1.5], [-1.5, .0], rosenbrock_function)
+    _, simplex_history = run_nelder_mead(simplex)
+    fig = visualise_nelder_mead_optimisation(
+        simplex_history, rosenbrock_function, get_canvas_range(simplex_history), fast=True, max_simplices=50
+    )
+    line_collections = [collection for collection in fig.axes[0].collections if type(collection).__name__ == "LineCollection"]
+    assert len(line_collections) == 1
+    assert len(line_collections[0].get_segments()) == 50 * 3
+
+
+def test_get_centroid():
+    np.testing.assert_array_almost_equal(get_centroid(x_1=np.array([0., 0.]), x_2=np.array([2., 4.])), [1., 2.])
+    np.testing.assert_array_almost_equal(
+        get_centroid(np.array([0., 0., 0.]), np.array([3., 0., 0.]), np.array([0., 3., 3.])), [1., 1., 1.]
+    )
+
+
+def test_constrained_objective_vectorized():
+    objective = ConstrainedObjective(rosenbrock_function, [lambda x: x[0]], vectorized=True)
+    points = np.array([[1., 1.], [-1., 1.], [0., 0.]])
+    np.testing.assert_array_equal(objective(points.T), [0., np.inf, 1.])
+    assert objective.evaluations == 2 and objective.skipped == 1
@@ -1,27 +1,413 @@
+import itertools
+import os
+from collections import deque
+from typing import Callable, Iterator, Optional, Tuple
+
 import numpy as np
 
 def get_gradient(a, b):
     return np.array([2*a, 2*b]) # for f(x, y) = x^2 + y^2
 
-def steepest_descent_method(start_point, step_length, min_accuracy):
-    current_point = np.array(start_point)
-    iteration = 0
-    accuracy = min_accuracy + 1 # just to start the loop
-    continue_loop = True
-    while continue_loop:
+
+def _evaluate_batch(objective: Callable, points: np.ndarray, vectorized: bool, max_batch: Optional[int]) -> np.ndarray:
+    """
+    Evaluates the objective at all rows of points, with a vectorized objective in one call (or one call per max_batch rows).
+    """
+    if not vectorized:
+        return np.array([objective(point) for point in points])
+    chunk = len(points) if max_batch is None else max_batch
+    values = np.concatenate([np.atleast_1d(objective(points[i:i + chunk])) for i in range(0, len(points), chunk)])
+    if values.shape != (len(points),):
+        raise ValueError("Vectorized objective must return one value per row of a (k, n) array!")
+    return values
+
+
+def central_difference_gradient(objective: Callable, step: float = 1e-6, vectorized: bool = False,
+                                max_batch: Optional[int] = None) -> Callable:
+    """
+    Gradient approximated with central finite differences, all 2n perturbed points are evaluated in one batched call.
+    With vectorized flag the objective takes (k, n) array and returns k values, max_batch limits rows per call
+    to bound memory, otherwise it is called for each point.
+    """
+    def gradient(point: np.ndarray) -> np.ndarray:
+        point = np.asarray(point, dtype=float)
+        steps = step * np.maximum(1.0, np.abs(point))  # relative step for large coordinates
+        perturbations = np.diag(steps)
+        points = np.concatenate((point + perturbations, point - perturbations))
+        values = _evaluate_batch(objective, points, vectorized, max_batch)
+        return (values[:point.size] - values[point.size:]) / (2 * steps)
+    return gradient
+
+
+def complex_step_gradient(objective: Callable, step: float = 1e-20, vectorized: bool = False,
+                          max_batch: Optional[int] = None) -> Callable:
+    """
+    Gradient computed with complex-step differentiation, exact up to rounding for real analytic objectives
+    written with complex-safe operations (no abs, no comparisons), n perturbed points are evaluated in one call.
+    """
+    def gradient(point: np.ndarray) -> np.ndarray:
+        point = np.asarray(point, dtype=float)
+        points = point + 1j * step * np.eye(point.size)
+        return np.imag(_evaluate_batch(objective, points, vectorized, max_batch)) / step
+    return gradient
+
+
+def make_gradient(objective: Optional[Callable] = None, gradient_function: Optional[Callable] = None,
+                  method: str = "central", vectorized: bool = False, max_batch: Optional[int] = None) -> Callable:
+    """
+    Gradient provider, returns the analytic gradient if given, otherwise a numerical one of the objective.
+    Methods: "central" (finite differences), "complex" (complex step).
+    """
+    if gradient_function is not None:
+        return gradient_function
+    if objective is None:
+        raise ValueError("Numerical gradient requires the objective function!")
+    if method == "central":
+        return central_difference_gradient(objective, vectorized=vectorized, max_batch=max_batch)
+    elif method == "complex":
+        return complex_step_gradient(objective, vectorized=vectorized, max_batch=max_batch)
+    raise ValueError("Invalid gradient method. Method must be one of: central, complex!")
+
+
+def armijo_step(objective: Callable, point: np.ndarray, value: float, gradient: np.ndarray, direction: np.ndarray,
+                step_length: float = 1.0, c1: float = 1e-4, rho: float = 0.5,
+                max_steps: int = 50) -> Tuple[float, float]:
+    """
+    Backtracking line search, shortens the step until the Armijo (sufficient decrease) condition holds.
+    Returns the step length and the objective value at the accepted point, so it is not evaluated again.
+    """
+    slope = gradient @ direction
+    new_value = objective(point + step_length * direction)
+    for _ in range(max_steps):
+        if new_value <= value + c1 * step_length * slope:
+            break
+        step_length *= rho
+        new_value = objective(point + step_length * direction)
+    return step_length, new_value
+
+
+def wolfe_step(objective: Callable, gradient_function: Callable, point: np.ndarray, value: float,
+               gradient: np.ndarray, direction: np.ndarray, step_length: float = 1.0,
+               c1: float = 1e-4, c2: float = 0.9,
+               max_steps: int = 50) -> Tuple[float, Optional[float], Optional[np.ndarray]]:
+    """
+    Bisection line search, finds a step satisfying weak Wolfe conditions (sufficient decrease and curvature).
+    Returns the step length with the objective value and gradient at the accepted point, so they are not
+    evaluated again (both None if max_steps is reached before the conditions hold).
+    """
+    slope = gradient @ direction
+    lower, upper = 0.0, np.inf
+    for _ in range(max_steps):
+        new_point = point + step_length * direction
+        new_value = objective(new_point)
+        if new_value > value + c1 * step_length * slope:
+            upper = step_length
+        else:
+            new_gradient = gradient_function(new_point)
+            if new_gradient @ direction < c2 * slope:
+                lower = step_length
+            else:
+                return step_length, new_value, new_gradient
+        step_length = (lower + upper) / 2 if upper < np.inf else 2 * lower
+    return step_length, None, None
+
+
+def _lbfgs_direction(gradient: np.ndarray, memory: deque) -> np.ndarray:
+    """
+    Two-loop recursion, returns the quasi-Newton direction from the stored (s, y, 1 / y^T s) pairs.
+    """
+    q = gradient.copy()
+    alphas = []
+    for s, y, rho in reversed(memory):
+        alpha = rho * (s @ q)
+        q -= alpha * y
+        alphas.append(alpha)
+    if memory:
+        s, y, _ = memory[-1]
+        q *= (s @ y) / (y @ y)  # initial Hessian approximation scaled as in Nocedal & Wright
+    for (s, y, rho), alpha in zip(memory, reversed(alphas)):
+        beta = rho * (y @ q)
+        q += (alpha - beta) * s
+    return -q
+
+
+def minimize(gradient_function: Optional[Callable], start_point, objective: Optional[Callable] = None,
+             method: str = "gd", line_search: Optional[str] = None, step_length: float = 0.1,
+             momentum: float = 0.9, memory_size: int = 10, min_accuracy: float = 1e-6,
+             max_iter: int = 10000, keep_points: bool = False, verbose: bool = False,
+             gradient_method: str = "central", vectorized: bool = False) -> Tuple[np.ndarray, dict]:
+    """
+    First-order minimisation of a function of n variables.
+    Methods: "gd" (steepest descent), "momentum" (heavy ball), "nesterov", "lbfgs".
+    Line search ("armijo" or "wolfe") needs the objective, L-BFGS uses Wolfe line search by default.
+    Stops when the length of the step drops below min_accuracy or after max_iter iterations.
+    Without gradient_function the gradient of the objective is computed numerically (see make_gradient),
+    with vectorized flag the objective takes (k, n) array and returns k values.
+    Returns the solution and history with objective values (if objective given), gradient and step norms,
+    and, if keep_points is set, all visited points.
+    """
+    gradient_function = make_gradient(objective, gradient_function, gradient_method, vectorized)
+    if objective is not None and vectorized:
+        batch_objective = objective
+        objective = lambda point: batch_objective(np.asarray(point)[np.newaxis])[0]  # single point as a (1, n) batch
+    if method not in ("gd", "momentum", "nesterov", "lbfgs"):
+        raise ValueError("Invalid method. Method must be one of: gd, momentum, nesterov, lbfgs!")
+    if method == "lbfgs" and line_search is None:
+        line_search = "wolfe"
+    if line_search not in (None, "armijo", "wolfe"):
+        raise ValueError("Invalid line search. Line search must be one of: armijo, wolfe!")
+    if line_search is not None and method in ("momentum", "nesterov"):
+        raise ValueError("Line search is available only for gd and lbfgs methods!")
+    if line_search is not None and objective is None:
+        raise ValueError("Line search requires the objective function!")
+
+    current_point = np.array(start_point, dtype=float)
+    velocity = np.zeros_like(current_point)
+    memory = deque(maxlen=memory_size)
+    history = {"value": [], "gradient_norm": [], "step_norm": []}
+    if keep_points:
+        history["point"] = [current_point.copy()]
+
+    gradient = gradient_function(current_point)
+    value = objective(current_point) if objective is not None else None
+    for iteration in range(max_iter):
+        if method == "lbfgs":
+            direction = _lbfgs_direction(gradient, memory)
+            initial_step = 1.0
+        else:
+            direction = -gradient
+            initial_step = step_length
+
+        # Line searches return the value (and gradient) at the accepted point, they are reused below
+        next_value, next_gradient = None, None
+        if line_search == "armijo":
+            length, next_value = armijo_step(objective, current_point, value, gradient, direction, initial_step)
+            step = length * direction
+        elif line_search == "wolfe":
+            length, next_value, next_gradient = wolfe_step(objective, gradient_function, current_point, value,
+                                                           gradient, direction, initial_step)
+            step = length * direction
+        elif method == "momentum":
+            velocity = momentum * velocity - step_length * gradient
+            step = velocity
+        elif method == "nesterov":
+            velocity = momentum * velocity - step_length * gradient_function(current_point + momentum * velocity)
+            step = velocity
+        else:
+            step = step_length * direction
+
+        next_point = current_point + step
+        if next_gradient is None:
+            next_gradient = gradient_function(next_point)
+        if method == "lbfgs":
+            gradient_change = next_gradient - gradient
+            curvature = gradient_change @ step
+            if curvature > 1e-12:  # skip pairs which would break positive definiteness
+                memory.append((step, gradient_change, 1.0 / curvature))
+
+        accuracy = np.linalg.norm(step)
+        if objective is not None:
+            value = objective(next_point) if next_value is None else next_value
+            history["value"].append(value)
+        history["gradient_norm"].append(np.linalg.norm(gradient))
+        history["step_norm"].append(accuracy)
+        if keep_points:
+            history["point"].append(next_point.copy())
+        if verbose:
+            print("Iteracja", iteration, ": x =", current_point, "Gradient:", gradient, "Dokładność do następnego:", round(accuracy, 4))
+
+        current_point, gradient = next_point, next_gradient
         if accuracy < min_accuracy:
-            print("Kryterium stopu osiągnięte, " + str(accuracy) + " < " + str(min_accuracy))
-            continue_loop = False
-        gradient = get_gradient(*current_point)
-        next_point = current_point - step_length * gradient
-        accuracy = round(np.linalg.norm(next_point - current_point),4)
-        print("Iteracja", iteration, ": x =", current_point, "Gradient:", gradient, "Dokładność do następnego:", accuracy)
-        iteration += 1
-        current_point = next_point
-    
+            if verbose:
+                print("Kryterium stopu osiągnięte, " + str(accuracy) + " < " + str(min_accuracy))
+            break
+
+    return current_point, {key: np.array(values) for key, values in history.items()}
+
+
+def steepest_descent_method(start_point, step_length, min_accuracy, gradient_function: Optional[Callable] = None,
+                            verbose: bool = True, max_iter: int = 10000, objective: Optional[Callable] = None,
+                            gradient_method: str = "central", vectorized: bool = False) -> Tuple[np.ndarray, dict]:
+    """
+    Steepest descent with a fixed step, by default for f(x, y) = x^2 + y^2.
+    With an objective and no gradient_function the gradient is computed numerically (see make_gradient).
+    """
+    if gradient_function is None and objective is None:
+        gradient_function = lambda point: get_gradient(*point)
+    return minimize(gradient_function, start_point, objective, step_length=step_length, min_accuracy=min_accuracy,
+                    max_iter=max_iter, verbose=verbose, gradient_method=gradient_method, vectorized=vectorized)
+
+
+def batch_steepest_descent_method(start_points, step_length, min_accuracy,
+                                  gradient_function: Optional[Callable] = None,
+                                  max_iter: int = 10000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Steepest descent from many start points at once, e.g. to map basins of attraction.
+    Points are kept in a (k, n) array updated with one array expression per iteration,
+    gradient_function takes a (k, n) array of points and returns (k, n) gradients (default for f(x, y) = x^2 + y^2).
+    Runs which reached min_accuracy are frozen, their gradient is not evaluated any more.
+    Returns final points and number of iterations of every run.
+    """
+    if gradient_function is None:
+        gradient_function = lambda points: get_gradient(*points.T).T
+    points = np.array(start_points, dtype=float)
+    iterations = np.zeros(len(points), dtype=int)
+    active = np.ones(len(points), dtype=bool)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        active_points = points[active]
+        steps = step_length * gradient_function(active_points)
+        points[active] = active_points - steps
+        iterations[active] += 1
+        active[active] = np.linalg.norm(steps, axis=1) >= min_accuracy
+    return points, iterations
+
+
+# Mini-batch stochastic gradient
+
+def array_batches(features: np.ndarray, targets: np.ndarray, batch_size: int, shuffle: bool = True,
+                  seed: int = 0, epoch: int = 0) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yields (features, targets) mini-batches of in-memory (or memory-mapped) arrays.
+    Shuffling permutes row indices only, data is never copied as a whole,
+    the permutation depends only on (seed, epoch), so a resumed run sees the same batches.
+    """
+    order = np.random.default_rng((seed, epoch)).permutation(len(targets)) if shuffle else np.arange(len(targets))
+    for start in range(0, len(targets), batch_size):
+        indices = np.sort(order[start:start + batch_size])  # sorted indices read memory-mapped data sequentially
+        yield features[indices], targets[indices]
+
+
+def csv_batches(file_path: str, batch_size: int, target_column: int = -1, skip_header: int = 1,
+                delimiter: str = ",", shuffle: bool = True, seed: int = 0, epoch: int = 0,
+                shuffle_buffer: int = 16) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Streams (features, targets) mini-batches from a CSV file without loading it whole.
+    Shuffling (if set) permutes the row indices of a buffer of shuffle_buffer batches read in sequence,
+    so batch composition changes every epoch while at most batch_size * shuffle_buffer rows are in memory,
+    rows never move between buffers. The permutations depend only on (seed, epoch), as in array_batches.
+    """
+    rng = np.random.default_rng((seed, epoch))
+    buffer_rows = batch_size * (shuffle_buffer if shuffle else 1)
+    with open(file_path) as file:
+        lines = itertools.islice(file, skip_header, None)
+        while True:
+            chunk = list(itertools.islice(lines, buffer_rows))
+            if not chunk:
+                break
+            data = np.loadtxt(chunk, delimiter=delimiter, ndmin=2)
+            order = rng.permutation(len(data)) if shuffle else np.arange(len(data))
+            for start in range(0, len(data), batch_size):
+                batch = data[order[start:start + batch_size]]
+                yield np.delete(batch, target_column, axis=1), batch[:, target_column]
+
+
+def least_squares_batch_gradient(point: np.ndarray, batch: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """
+    Gradient of the mean squared error of a linear model (as the LSS loss) over a mini-batch.
+    """
+    features, targets = batch
+    return 2 * features.T @ (features @ point - targets) / len(targets)
+
+
+def make_schedule(learning_rate: float, schedule: str = "constant", decay: float = 0.5,
+                  decay_steps: int = 1000, total_steps: Optional[int] = None) -> Callable:
+    """
+    Learning rate schedule, returns a function of the step number.
+    Schedules: "constant", "step" (multiply by decay every decay_steps), "exponential",
+    "inverse" (lr / (1 + decay * step / decay_steps)), "cosine" (anneals to 0 over total_steps).
+    """
+    if schedule == "constant":
+        return lambda step: learning_rate
+    elif schedule == "step":
+        return lambda step: learning_rate * decay ** (step // decay_steps)
+    elif schedule == "exponential":
+        return lambda step: learning_rate * decay ** (step / decay_steps)
+    elif schedule == "inverse":
+        return lambda step: learning_rate / (1 + decay * step / decay_steps)
+    elif schedule == "cosine":
+        if total_steps is None:
+            raise ValueError("Cosine schedule requires total_steps!")
+        return lambda step: learning_rate * 0.5 * (1 + np.cos(np.pi * min(step, total_steps) / total_steps))
+    raise ValueError("Invalid schedule. Schedule must be one of: constant, step, exponential, inverse, cosine!")
+
+
+def _save_checkpoint(checkpoint_path: str, **state) -> None:
+    """
+    Saves optimiser state atomically, an interrupted save never corrupts the previous checkpoint.
+    """
+    temporary_path = checkpoint_path + ".tmp.npz"
+    np.savez(temporary_path, **state)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def stochastic_gradient_method(batch_gradient: Callable, start_point, batches: Callable[[int], Iterator],
+                               epochs: int = 10, method: str = "adam", learning_rate=0.01, momentum: float = 0.9,
+                               beta_2: float = 0.999, epsilon: float = 1e-8, checkpoint_path: Optional[str] = None,
+                               checkpoint_every: int = 1000, verbose: bool = False) -> Tuple[np.ndarray, dict]:
+    """
+    Mini-batch stochastic gradient minimisation of a sum over data rows.
+    batch_gradient(point, batch) returns the gradient over a batch, batches(epoch=epoch) returns an iterator of batches
+    (e.g. functools.partial(array_batches, X, y, 256) or partial(csv_batches, path, 256)),
+    epoch is passed by keyword so it does not bind to other positional parameters of the partial.
+    Methods: "sgd", "momentum", "adam". learning_rate is a number or a function of the step (see make_schedule).
+    With checkpoint_path (.npz) the optimiser state is saved every checkpoint_every steps and after each epoch,
+    an existing checkpoint is loaded and the run resumes from the saved batch.
+    Returns the solution and history with gradient norms and learning rates of every step.
+    """
+    if method not in ("sgd", "momentum", "adam"):
+        raise ValueError("Invalid method. Method must be one of: sgd, momentum, adam!")
+    schedule = learning_rate if callable(learning_rate) else make_schedule(learning_rate)
+
+    current_point = np.array(start_point, dtype=float)
+    first_moment = np.zeros_like(current_point)
+    second_moment = np.zeros_like(current_point)
+    step, start_epoch, start_batch = 0, 0, 0
+    if checkpoint_path is not None and os.path.isfile(checkpoint_path):
+        with np.load(checkpoint_path) as checkpoint:
+            current_point = checkpoint["point"]
+            first_moment, second_moment = checkpoint["first_moment"], checkpoint["second_moment"]
+            step, start_epoch, start_batch = (int(checkpoint[key]) for key in ("step", "epoch", "batch"))
+        if verbose:
+            print("Wznowiono od epoki", start_epoch, "partii", start_batch)
+
+    history = {"gradient_norm": [], "learning_rate": []}
+    for epoch in range(start_epoch, epochs):
+        batch_number = start_batch if epoch == start_epoch else 0
+        for batch in itertools.islice(batches(epoch=epoch), batch_number, None):
+            gradient = batch_gradient(current_point, batch)
+            rate = schedule(step)
+            step += 1
+            batch_number += 1
+            if method == "sgd":
+                current_point = current_point - rate * gradient
+            elif method == "momentum":
+                first_moment = momentum * first_moment + gradient
+                current_point = current_point - rate * first_moment
+            else:
+                first_moment = momentum * first_moment + (1 - momentum) * gradient
+                second_moment = beta_2 * second_moment + (1 - beta_2) * gradient**2
+                corrected_first = first_moment / (1 - momentum**step)
+                corrected_second = second_moment / (1 - beta_2**step)
+                current_point = current_point - rate * corrected_first / (np.sqrt(corrected_second) + epsilon)
+            history["gradient_norm"].append(np.linalg.norm(gradient))
+            history["learning_rate"].append(rate)
+            if checkpoint_path is not None and step % checkpoint_every == 0:
+                _save_checkpoint(checkpoint_path, point=current_point, first_moment=first_moment,
+                                 second_moment=second_moment, step=step, epoch=epoch, batch=batch_number)
+        if checkpoint_path is not None:
+            _save_checkpoint(checkpoint_path, point=current_point, first_moment=first_moment,
+                             second_moment=second_moment, step=step, epoch=epoch + 1, batch=0)
+        if verbose:
+            print("Epoka", epoch, ": x =", current_point)
+
+    return current_point, {key: np.array(values) for key, values in history.items()}
+
 
 # Test
-start_point = [4, 4]
-step_length = 0.3
-min_accuracy = 1e-2
-steepest_descent_method(start_point, step_length, min_accuracy)
\ No newline at end of file
+if __name__ == "__main__":
+    start_point = [4, 4]
+    step_length = 0.3
+    min_accuracy = 1e-2
+    steepest_descent_method(start_point, step_length, min_accuracy)
@@ -0,0 +1,294 @@
+"""Testing script for the steepest descent methods."""
+
+import functools
+import itertools
+
+import numpy as np
+import pytest
+
+from steepestDescend import (
+    armijo_step, array_batches, batch_steepest_descent_method, central_difference_gradient, csv_batches,
+    least_squares_batch_gradient, make_gradient,
+    make_schedule, minimize, steepest_descent_method, stochastic_gradient_method, wolfe_step
+)
+
+
+def rosenbrock(point):
+    x, y = point[0], point[1]
+    return (1 - x)**2 + 100 * (y - x**2)**2
+
+
+def rosenbrock_gradient(point):
+    x, y = point
+    return np.array([-2 * (1 - x) - 400 * x * (y - x**2), 200 * (y - x**2)])
+
+
+class Counted:
+    """Function wrapper counting calls."""
+
+    def __init__(self, function):
+        self.function = function
+        self.calls = 0
+
+    def __call__(self, point):
+        self.calls += 1
+        return self.function(point)
+
+
+@pytest.mark.parametrize(
+    "method, line_search",
+    [
+        ("gd", None),
+        ("momentum", None),
+        ("nesterov", None),
+        ("gd", "armijo"),
+        ("gd", "wolfe"),
+        ("lbfgs", None),
+    ]
+)
+def test_minimize_quadratic(method, line_search):
+    matrix = np.diag([1., 10.])
+    point, history = minimize(
+        lambda x: matrix @ x, [3., -2.], objective=lambda x: 0.5 * x @ matrix @ x,
+        method=method, line_search=line_search, step_length=0.05, min_accuracy=1e-10
+    )
+    np.testing.assert_array_almost_equal(point, [0., 0.], decimal=5)
+    assert len(history["value"]) == len(history["gradient_norm"]) == len(history["step_norm"])
+    assert history["step_norm"][-1] < 1e-10
+
+
+def test_minimize_lbfgs_rosenbrock():
+    point, history = minimize(rosenbrock_gradient, [-1.2, 1.], objective=rosenbrock, method="lbfgs",
+                              min_accuracy=1e-12, keep_points=True)
+    np.testing.assert_array_almost_equal(point, [1., 1.], decimal=6)
+    assert len(history["point"]) == len(history["value"]) + 1
+    assert len(history["value"]) < 100
+
+
+def test_minimize_invalid_options():
+    with pytest.raises(ValueError):
+        minimize(rosenbrock_gradient, [0., 0.], method="newton")
+    with pytest.raises(ValueError):
+        minimize(rosenbrock_gradient, [0., 0.], line_search="armijo")
+    with pytest.raises(ValueError):
+        minimize(rosenbrock_gradient, [0., 0.], objective=rosenbrock, method="momentum", line_search="armijo")
+
+
+def test_line_searches_return_accepted_values():
+    point = np.array([-1.2, 1.])
+    gradient = rosenbrock_gradient(point)
+    length, value = armijo_step(rosenbrock, point, rosenbrock(point), gradient, -gradient)
+    assert value == rosenbrock(point - length * gradient) < rosenbrock(point)
+    length, value, new_gradient = wolfe_step(rosenbrock, rosenbrock_gradient, point, rosenbrock(point),
+                                             gradient, -gradient)
+    assert value == rosenbrock(point - length * gradient)
+    np.testing.assert_array_equal(new_gradient, rosenbrock_gradient(point - length * gradient))
+
+
+@pytest.mark.parametrize("line_search", ["armijo", "wolfe"])
+def test_minimize_reuses_line_search_evaluations(line_search):
+    objective, gradient_function = Counted(rosenbrock), Counted(rosenbrock_gradient)
+    point, history = minimize(gradient_function, [-1.2, 1.], objective=objective,
+                              line_search=line_search, max_iter=20)
+    # Starting point once, then per iteration only the line search trials (no re-evaluation of the accepted point)
+    line_search_objective = Counted(rosenbrock)
+    current = np.array([-1.2, 1.])
+    value, gradient = rosenbrock(current), rosenbrock_gradient(current)
+    expected_gradient_calls = 1
+    for _ in range(20):
+        if line_search == "armijo":
+            length, value = armijo_step(line_search_objective, current, value, gradient, -gradient, 0.1)
+            expected_gradient_calls += 1
+        else:
+            counted_gradient = Counted(rosenbrock_gradient)
+            length, value, _ = wolfe_step(line_search_objective, counted_gradient, current, value,
+                                          gradient, -gradient, 0.1)
+            expected_gradient_calls += counted_gradient.calls
+        current = current - length * gradient
+        gradient = rosenbrock_gradient(current)
+    assert objective.calls == 1 + line_search_objective.calls
+    assert gradient_function.calls == expected_gradient_calls
+    np.testing.assert_array_equal(point, current)
+
+
+def test_steepest_descent_method_default_function():
+    point, history = steepest_descent_method([4, 4], 0.3, 1e-2, verbose=False)
+    np.testing.assert_array_almost_equal(point, [0., 0.], decimal=2)
+    assert history["step_norm"][-1] < 1e-2
+
+
+def cubic(point):
+    return point[0]**3 + np.sin(point[1]) * point[0] + np.exp(point[2])
+
+
+def cubic_gradient(point):
+    return np.array([3 * point[0]**2 + np.sin(point[1]), np.cos(point[1]) * point[0], np.exp(point[2])])
+
+
+def cubic_vectorized(points):
+    return points[:, 0]**3 + np.sin(points[:, 1]) * points[:, 0] + np.exp(points[:, 2])
+
+
+@pytest.mark.parametrize(
+    "method, objective, vectorized, decimal",
+    [
+        ("central", cubic, False, 6),
+        ("central", cubic_vectorized, True, 6),
+        ("complex", cubic, False, 12),
+        ("complex", cubic_vectorized, True, 12),
+    ]
+)
+def test_numerical_gradients_match_analytic(method, objective, vectorized, decimal):
+    gradient = make_gradient(objective, method=method, vectorized=vectorized)
+    for point in ([0.5, -1., 0.2], [2., 3., -1.]):
+        np.testing.assert_array_almost_equal(gradient(np.array(point)), cubic_gradient(np.array(point)), decimal)
+
+
+def test_central_difference_gradient_max_batch():
+    calls = []
+
+    def objective(points):
+        calls.append(len(points))
+        return cubic_vectorized(points)
+
+    gradient = central_difference_gradient(objective, vectorized=True, max_batch=4)
+    np.testing.assert_array_almost_equal(gradient(np.array([0.5, -1., 0.2])), cubic_gradient([0.5, -1., 0.2]))
+    assert calls == [4, 2]
+
+
+def test_steepest_descent_method_numerical_gradient():
+    point, _ = steepest_descent_method([4, 4], 0.3, 1e-2, verbose=False, objective=lambda x: x[0]**2 + x[1]**2)
+    np.testing.assert_array_almost_equal(point, [0., 0.], decimal=2)
+    point, _ = steepest_descent_method([4, 4], 0.3, 1e-2, verbose=False, gradient_method="complex",
+                                       objective=lambda x: x[:, 0]**2 + x[:, 1]**2, vectorized=True)
+    np.testing.assert_array_almost_equal(point, [0., 0.], decimal=2)
+
+
+@pytest.mark.parametrize(
+    "schedule, kwargs, steps, exp_val",
+    [
+        ("constant", {}, [0, 10, 1000], [0.1, 0.1, 0.1]),
+        ("step", {"decay": 0.5, "decay_steps": 10}, [0, 9, 10, 25], [0.1, 0.1, 0.05, 0.025]),
+        ("exponential", {"decay": 0.5, "decay_steps": 10}, [0, 5, 20], [0.1, 0.1 * 0.5**0.5, 0.025]),
+        ("inverse", {"decay": 1., "decay_steps": 10}, [0, 10, 30], [0.1, 0.05, 0.025]),
+        ("cosine", {"total_steps": 100}, [0, 50, 100, 200], [0.1, 0.05, 0., 0.]),
+    ]
+)
+def test_make_schedule(schedule, kwargs, steps, exp_val):
+    rate = make_schedule(0.1, schedule, **kwargs)
+    np.testing.assert_array_almost_equal([rate(step) for step in steps], exp_val)
+
+
+def test_make_schedule_invalid():
+    with pytest.raises(ValueError):
+        make_schedule(0.1, "cosine")
+    with pytest.raises(ValueError):
+        make_schedule(0.1, "linear")
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.mark.parametrize("method", ["sgd", "momentum", "adam"])
+def test_stochastic_gradient_method_resume(method, tmp_path):
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(200, 3))
+    targets = features @ np.array([1., -2., 0.5]) + rng.normal(0., 0.01, size=200)
+    batches = functools.partial(array_batches, features, targets, 16)
+    options = dict(epochs=3, method=method, learning_rate=make_schedule(0.05, "inverse", decay_steps=20))
+
+    expected_point, _ = stochastic_gradient_method(least_squares_batch_gradient, np.zeros(3), batches, **options)
+    assert np.linalg.norm(expected_point - [1., -2., 0.5]) < 0.5 * np.linalg.norm([1., -2., 0.5])
+
+    # First run is interrupted in the middle of the second epoch, after the checkpoint at step 20
+    def interrupted_batches(epoch):
+        for number, batch in enumerate(batches(epoch=epoch)):
+            if epoch == 1 and number == 10:
+                raise Interrupted()
+            yield batch
+
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    with pytest.raises(Interrupted):
+        stochastic_gradient_method(least_squares_batch_gradient, np.zeros(3), interrupted_batches,
+                                   checkpoint_path=checkpoint_path, checkpoint_every=20, **options)
+    with np.load(checkpoint_path) as checkpoint:
+        assert int(checkpoint["step"]) == 20 and int(checkpoint["epoch"]) == 1 and int(checkpoint["batch"]) == 7
+    point, history = stochastic_gradient_method(least_squares_batch_gradient, np.zeros(3), batches,
+                                                checkpoint_path=checkpoint_path, checkpoint_every=20, **options)
+    np.testing.assert_array_equal(point, expected_point)
+    assert len(history["gradient_norm"]) == 3 * 13 - 20
+
+
+def write_csv(tmp_path, rows: int) -> str:
+    # Row number as the feature and a target identifying the row
+    file_path = str(tmp_path / "data.csv")
+    np.savetxt(file_path, np.column_stack([np.arange(rows), np.ones(rows), 2. * np.arange(rows)]),
+               delimiter=",", header="x,bias,y", comments="")
+    return file_path
+
+
+def test_csv_batches(tmp_path):
+    file_path = write_csv(tmp_path, 205)
+    batches = functools.partial(csv_batches, file_path, 10, shuffle_buffer=4)
+    epochs = [[tuple(features[:, 0].astype(int)) for features, _ in batches(epoch=epoch)] for epoch in range(2)]
+    for epoch_batches in epochs:
+        assert [len(batch) for batch in epoch_batches] == [10] * 20 + [5]
+        assert sorted(itertools.chain(*epoch_batches)) == list(range(205))
+        # Rows are mixed only within a buffer of 4 batches
+        assert all(set(batch) <= set(range(40 * (number // 4), 40 * (number // 4 + 1)))
+                   for number, batch in enumerate(epoch_batches))
+    assert set(epochs[0]).isdisjoint(epochs[1])
+    for features, targets in batches(epoch=0):
+        np.testing.assert_array_equal(targets, 2 * features[:, 0])
+    sequential = [tuple(features[:, 0].astype(int)) for features, _ in csv_batches(file_path, 10, shuffle=False)]
+    assert sequential == [tuple(range(start, min(start + 10, 205))) for start in range(0, 205, 10)]
+    # Resumed runs skip batches with islice and see the same remaining batches
+    resumed = [tuple(features[:, 0].astype(int)) for features, _ in itertools.islice(batches(epoch=1), 7, None)]
+    assert resumed == epochs[1][7:]
+
+
+def test_stochastic_gradient_method_resume_csv(tmp_path):
+    batches = functools.partial(csv_batches, write_csv(tmp_path, 100), 8, shuffle_buffer=3)
+    options = dict(epochs=2, method="sgd", learning_rate=1e-6)
+    expected_point, _ = stochastic_gradient_method(least_squares_batch_gradient, np.zeros(2), batches, **options)
+
+    def interrupted_batches(epoch):
+        for number, batch in enumerate(batches(epoch=epoch)):
+            if epoch == 1 and number == 5:
+                raise Interrupted()
+            yield batch
+
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    with pytest.raises(Interrupted):
+        stochastic_gradient_method(least_squares_batch_gradient, np.zeros(2), interrupted_batches,
+                                   checkpoint_path=checkpoint_path, checkpoint_every=15, **options)
+    point, _ = stochastic_gradient_method(least_squares_batch_gradient, np.zeros(2), batches,
+                                          checkpoint_path=checkpoint_path, checkpoint_every=15, **options)
+    np.testing.assert_array_equal(point, expected_point)
+
+
+def test_batch_steepest_descent_method():
+    start_points = np.array([[4., 4.], [0., 0.], [-1., 0.5], [10., -3.]])
+    evaluated_rows = []
+
+    def gradient_function(points):
+        evaluated_rows.append(len(points))
+        return 2 * points
+
+    points, iterations = batch_steepest_descent_method(start_points, 0.3, 1e-2, gradient_function)
+    for start_point, point, iteration_count in zip(start_points, points, iterations):
+        expected_point, history = steepest_descent_method(start_point, 0.3, 1e-2, verbose=False)
+        np.testing.assert_array_almost_equal(point, expected_point)
+        assert iteration_count == len(history["step_norm"])
+    # Frozen runs are not evaluated nor moved any more
+    assert sum(evaluated_rows) == iterations.sum()
+    assert evaluated_rows == sorted(evaluated_rows, reverse=True)
+    np.testing.assert_array_equal(points[1], [0., 0.])
+    assert iterations[1] == 1
+
+
+def test_batch_steepest_descent_method_max_iter():
+    points, iterations = batch_steepest_descent_method([[4., 4.], [1e-3, 0.]], 0.3, 1e-2, max_iter=3)
+    np.testing.assert_array_equal(iterations, [3, 1])
+    np.testing.assert_array_almost_equal(points[0], [4. * 0.4**3, 4. * 0.4**3])
@@ -1,4 +1,9 @@
-import pandas, matplotlib.pyplot, os, numpy
+from __future__ import annotations
+import os, numpy
+import atexit, queue, threading
+from typing import TYPE_CHECKING, Optional
+if TYPE_CHECKING:   # matplotlib and pandas are imported on first use, they dominate the startup time
+    import pandas
 
 LABEL_MAGNETIC_FIELD:str = "Magnetic field strength B (µT)"
 LABEL_CURRENT:str = "Current I (mA)"
@@ -6,19 +11,87 @@ LABEL_TIME:str = "Time t (s)"
 LABEL_BACKGROUND_TEMP:str = "Background Temperature T (°C)"
 
 
-def graph_data_against_time(dataFrame: pandas.DataFrame, current:bool = True, magneticField:bool = True, show:bool=False) -> None:
+MAX_PLOT_POINTS:int = 2000    # More points than pixels only slow down rendering
+DOWNSAMPLE_METHODS:tuple[str, ...] = ("lttb", "minmax")
+
+
+def lttb_downsample(x: numpy.ndarray, y: numpy.ndarray, pointCount: int) -> numpy.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling, returns indices of pointCount points keeping the visual shape.
+    x must be sorted, first and last points are always kept.
+    From each bucket the point forming the largest triangle with the previous selected point
+    and the average of the next bucket is selected.
+    """
+    n = len(x)
+    if pointCount >= n or pointCount < 3:
+        return numpy.arange(n)
+    x = numpy.asarray(x, dtype=float)
+    y = numpy.asarray(y, dtype=float)
+    # pointCount - 2 buckets between the first and the last point
+    edges = numpy.linspace(1, n - 1, pointCount - 1).astype(int)
+    bucketSizes = numpy.diff(edges)
+    averageX = numpy.append(numpy.add.reduceat(x[:n - 1], edges[:-1]) / bucketSizes, x[-1])
+    averageY = numpy.append(numpy.add.reduceat(y[:n - 1], edges[:-1]) / bucketSizes, y[-1])
+    selected = numpy.empty(pointCount, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(pointCount - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        areas = numpy.abs((x[previous] - averageX[bucket + 1]) * (y[start:stop] - y[previous])
+                          - (x[previous] - x[start:stop]) * (averageY[bucket + 1] - y[previous]))
+        previous = start + int(numpy.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def min_max_downsample(y: numpy.ndarray, bucketCount: int) -> numpy.ndarray:
+    """
+    Keeps the minimum and maximum of each of bucketCount buckets of consecutive points, returns sorted indices.
+    Every peak survives, at most 2 * bucketCount + 2 points are kept.
+    """
+    n = len(y)
+    if 2 * bucketCount >= n:
+        return numpy.arange(n)
+    bucketSize = -(-n // bucketCount)
+    padded = numpy.full(-(-n // bucketSize) * bucketSize, numpy.nan)
+    padded[:n] = y
+    padded = padded.reshape(-1, bucketSize)
+    offsets = numpy.arange(padded.shape[0]) * bucketSize
+    indices = numpy.concatenate(([0, n - 1], offsets + numpy.nanargmin(padded, axis=1),
+                                 offsets + numpy.nanargmax(padded, axis=1)))
+    return numpy.unique(indices)
+
+
+def downsample_for_plot(x: numpy.ndarray, y: numpy.ndarray, maxPoints: int = MAX_PLOT_POINTS,
+                        method: str = "lttb") -> numpy.ndarray:
+    """
+    Indices of at most about maxPoints points to plot instead of the whole series, x must be sorted.
+    """
+    if method == "lttb":
+        return lttb_downsample(x, y, maxPoints)
+    if method == "minmax":
+        return min_max_downsample(y, maxPoints // 2)
+    raise ValueError("Unknown downsample method "+method+", available: "+", ".join(DOWNSAMPLE_METHODS))
+
+
+def graph_data_against_time(dataFrame: pandas.DataFrame, current:bool = True, magneticField:bool = True, show:bool=False,
+                            maxPoints:int = MAX_PLOT_POINTS, downsampleMethod:str = "lttb") -> None:
     """
     Plot the experiment data from a DataFrame,
     Time is the x-axis, current and magnetic field on y-axis.
+    Long recordings are downsampled to about maxPoints points per series.
     """
     if not current and not magneticField:
         print("graph_data_against_time failed, no data selected to plot.")
         return
+    import matplotlib.pyplot
+    time = dataFrame[LABEL_TIME].values
     # Plot the data
-    if current:
-        matplotlib.pyplot.plot(dataFrame[LABEL_TIME], dataFrame[LABEL_CURRENT],'o-', label=LABEL_CURRENT)
-    if magneticField:
-        matplotlib.pyplot.plot(dataFrame[LABEL_TIME], dataFrame[LABEL_MAGNETIC_FIELD], 'o-', label=LABEL_MAGNETIC_FIELD)
+    for selected, label in ((current, LABEL_CURRENT), (magneticField, LABEL_MAGNETIC_FIELD)):
+        if selected:
+            values = dataFrame[label].values
+            indices = downsample_for_plot(time, values, maxPoints, downsampleMethod)
+            matplotlib.pyplot.plot(time[indices], values[indices], 'o-' if len(indices) < 200 else '-', label=label)
     #Add labels and legend
     matplotlib.pyplot.xlabel(LABEL_TIME)
     matplotlib.pyplot.ylabel("Current / Magnetic Field")
@@ -26,21 +99,29 @@ def graph_data_against_time(dataFrame: pandas.DataFrame, current:bool = True, ma
     show_or_save(show)
 
 def graph_polynomial_fit(dataFrame: pandas.DataFrame, x_label: str, y_label: str, 
-                         coefficents: list[float], show:bool=False, title:str="Polynomial fit graph") -> None:
+                         coefficents: list[float], show:bool=False, title:str="Polynomial fit graph",
+                         maxPoints:int = MAX_PLOT_POINTS, downsampleMethod:str = "lttb") -> None:
     """
     Plots the polynomial fit along with the original data points.
+    Data points are downsampled to about maxPoints, fit curve is evaluated once per pixel of the figure width.
     """
+    import matplotlib.pyplot
     # Extract x and y values from the dataframe
     x = dataFrame[x_label].values
     y = dataFrame[y_label].values
+    # Downsampling needs sorted x
+    order = numpy.argsort(x, kind="stable")
+    indices = order[downsample_for_plot(x[order], y[order], maxPoints, downsampleMethod)]
 
-    # Generate a range of x values for plotting the polynomial curve
-    x_range = numpy.linspace(x.min(), x.max(), 500)
+    # Generate a range of x values for plotting the polynomial curve, one per pixel
+    figure = matplotlib.pyplot.gcf()
+    pixelWidth = int(figure.get_size_inches()[0] * figure.dpi)
+    x_range = numpy.linspace(x.min(), x.max(), pixelWidth)
     # Calculate the corresponding y values using the polynomial coefficients
     y_fit = numpy.polyval(coefficents, x_range)
 
     # Plot the original data points
-    matplotlib.pyplot.scatter(x, y, label='Data Points')
+    matplotlib.pyplot.scatter(x[indices], y[indices], label='Data Points')
     # Plot the polynomial fit curve
     matplotlib.pyplot.plot(x_range, y_fit, label=f'Polynomial fit line')
     matplotlib.pyplot.gca().invert_xaxis()
@@ -51,16 +132,89 @@ def graph_polynomial_fit(dataFrame: pandas.DataFrame, x_label: str, y_label: str
     matplotlib.pyplot.legend()
     show_or_save(show)
 
+
+PLOTS_FOLDER:str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "Plots")
+_plot_queue:queue.Queue = queue.Queue()
+_plot_writer:Optional[threading.Thread] = None
+_plot_lock = threading.Lock()
+_next_plot_number:Optional[int] = None
+
+
+def _claim_plot_path() -> str:
+    """
+    Returns path of the next free PlotN.png, the folder is scanned once and then numbers come from a counter.
+    Exclusive creation claims the number, so parallel workers never overwrite each others plots.
+    """
+    global _next_plot_number
+    with _plot_lock:
+        if _next_plot_number is None:
+            os.makedirs(PLOTS_FOLDER, exist_ok=True)
+            numbers = [int(name[4:-4]) for name in os.listdir(PLOTS_FOLDER)
+                       if name.startswith("Plot") and name.endswith(".png") and name[4:-4].isdigit()]
+            _next_plot_number = max(numbers, default=0) + 1
+        while True:
+            file_path = os.path.join(PLOTS_FOLDER, "Plot"+str(_next_plot_number)+".png")
+            _next_plot_number += 1
+            try:
+                with open(file_path, "xb"):
+                    return file_path
+            except FileExistsError: # Taken by another process
+                continue
+
+
+def _write_plots() -> None:
+    """
+    Background thread rendering queued figures to PNG files.
+    """
+    while True:
+        figure, file_path = _plot_queue.get()
+        try:
+            figure.savefig(file_path)
+        except Exception as error:
+            print("show_or_save failed for "+file_path+": "+repr(error))
+        finally:
+            _plot_queue.task_done()
+
+
+def flush_plots() -> None:
+    """
+    Waits until all queued plots are written, called automatically at exit.
+    """
+    _plot_queue.join()
+
+
+def _reset_plot_writer() -> None:
+    """
+    Forked child processes do not inherit the writer thread, they start their own queue and writer.
+    """
+    global _plot_queue, _plot_writer, _plot_lock
+    _plot_queue = queue.Queue()
+    _plot_writer = None
+    _plot_lock = threading.Lock()
+
+
+atexit.register(flush_plots)
+if hasattr(os, "register_at_fork"): # Not available on Windows, where workers are spawned
+    os.register_at_fork(after_in_child=_reset_plot_writer)
+
+
 def show_or_save(show:bool) -> None:
+    """
+    Shows the current figure or saves it as the next PlotN.png in the Plots folder.
+    Saved figures are detached from pyplot and rendered with Agg in a background thread,
+    so the caller does not wait on PNG encoding.
+    """
+    global _plot_writer
+    import matplotlib.pyplot
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
     if show:
         matplotlib.pyplot.show()
     else:
-        #Save as Plot1, if it already exists save as Plot2, etc.
-        filePath:str = os.path.dirname(os.path.realpath(__file__))  # Get the path of the current file
-        plotNumber = 1
-        filePath = os.path.join(filePath, "Plots")
-        while os.path.isfile(os.path.join(filePath, "Plot"+str(plotNumber)+".png")):
-            plotNumber += 1
-        filePath = os.path.join(filePath, "Plot"+str(plotNumber)+".png")
-        matplotlib.pyplot.savefig(filePath)
-        matplotlib.pyplot.close()
\ No newline at end of file
+        figure = matplotlib.pyplot.gcf()
+        matplotlib.pyplot.close(figure)
+        FigureCanvasAgg(figure) # Detached figure gets its own Agg canvas, independent of pyplot state
+        with _plot_lock:
+            if _plot_writer is None:
+                _plot_writer = threading.Thread(target=_write_plots, name="plot-writer", daemon=True)
+                _plot_writer.start()
+        _plot_queue.put((figure, _claim_plot_path()))
@@ -1,42 +1,136 @@
+from __future__ import annotations
+import csv
+import hashlib
+import json
+import math
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, Optional, Sequence, Union
 import numpy
-import pandas
-from ydata_profiling import ProfileReport   # Newer version of pandas-profiling
-from Graphing import LABEL_CURRENT, LABEL_MAGNETIC_FIELD, LABEL_BACKGROUND_TEMP, graph_polynomial_fit
+if TYPE_CHECKING:   # pandas, matplotlib and ydata_profiling are imported on first use to keep startup fast
+    import pandas
+from Graphing import LABEL_CURRENT, LABEL_MAGNETIC_FIELD, LABEL_BACKGROUND_TEMP, LABEL_TIME, flush_plots, graph_polynomial_fit
 
 
-def read_experiment_csv(experiment_number: int, raw: bool) -> pandas.DataFrame:
+DATA_FOLDER:str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "Data")
+STORAGE_EXTENSIONS:dict[str, str] = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "npy": ".npy"}
+
+
+def experiment_file_path(experiment_number: int, raw: bool, storage: str = "csv") -> str:
     """
-    Read a experiment data file,
+    Path of a experiment data file in Raw or PreProcessed folder,
+    storage selects the file format: csv, parquet, feather (both need pyarrow) or npy.
+    """
+    if storage not in STORAGE_EXTENSIONS:
+        raise ValueError("Unknown storage "+storage+", available: "+", ".join(STORAGE_EXTENSIONS))
+    return os.path.join(DATA_FOLDER, "Raw" if raw else "PreProcessed",
+                        "Experiment"+str(experiment_number)+STORAGE_EXTENSIONS[storage])
+
+
+def list_experiment_numbers(raw: bool, storage: str = "csv") -> list[int]:
+    """
+    Numbers of experiments stored in Raw or PreProcessed folder in the given storage format, sorted.
+    """
+    extension = STORAGE_EXTENSIONS[storage]
+    folder_path = os.path.join(DATA_FOLDER, "Raw" if raw else "PreProcessed")
+    return sorted(int(name[len("Experiment"):-len(extension)]) for name in os.listdir(folder_path)
+                  if name.startswith("Experiment") and name.endswith(extension))
+
+
+def downcast_dtypes(data_frame: pandas.DataFrame) -> pandas.DataFrame:
+    """
+    Converts integer columns to the smallest of int16, int32 or int64 holding their values,
+    sensor readings are small integers, so memory shrinks 4 times or more.
+    Float columns are kept, float32 would lose precision of the readings.
+    """
+    import pandas
+    for column in data_frame.columns:
+        if pandas.api.types.is_integer_dtype(data_frame[column]):
+            downcast = pandas.to_numeric(data_frame[column], downcast="integer")
+            # int8 is avoided, differences of readings would overflow
+            data_frame[column] = downcast.astype(numpy.int16) if downcast.dtype.itemsize < 2 else downcast
+    return data_frame
+
+
+def _write_data_frame(data_frame: pandas.DataFrame, file_path: str, storage: str) -> None:
+    if storage == "csv":
+        data_frame.to_csv(file_path, index=False)
+    elif storage == "parquet":
+        data_frame.to_parquet(file_path, index=False)
+    elif storage == "feather":
+        data_frame.reset_index(drop=True).to_feather(file_path)
+    else:
+        numpy.save(file_path, data_frame.to_records(index=False), allow_pickle=False)
+
+
+def read_experiment_data(experiment_number: int, raw: bool, storage: str = "csv") -> pandas.DataFrame:
+    """
+    Read a experiment data file in the given storage format,
     number of experiment passed as argument,
     raw flag indicates if raw or preprocessed data should be read,
-    returns a pandas DataFrame.
+    returns a pandas DataFrame with downcast integer dtypes.
+    Binary formats are loaded without parsing.
     """
-    file_path:str = os.path.dirname(os.path.realpath(__file__))  # Get the path of the current file
-    if raw:
-        file_path = os.path.join(file_path, (r"Data\Raw\Experiment"+str(experiment_number)+".csv"))
-    else:
-        file_path = os.path.join(file_path, (r"Data\PreProcessed\Experiment"+str(experiment_number)+".csv"))
+    import pandas
+    file_path = experiment_file_path(experiment_number, raw, storage)
     try:
-        frame:pandas.DataFrame = pandas.read_csv(file_path)
-        return frame
+        if storage == "csv":
+            frame:pandas.DataFrame = pandas.read_csv(file_path)
+        elif storage == "parquet":
+            frame = pandas.read_parquet(file_path)
+        elif storage == "feather":
+            frame = pandas.read_feather(file_path)
+        else:
+            records = numpy.load(file_path, allow_pickle=False)
+            frame = pandas.DataFrame({name: records[name] for name in records.dtype.names})
+        return downcast_dtypes(frame)
     except FileNotFoundError:
-        print("read_experiment_csv failed, file not found, check if experiment data exists")
+        print("read_experiment_data failed, file not found, check if experiment data exists")
         raise   # Rethrow, this is not recoverable.
 
 
-def save_processed_csv(data_frame: pandas.DataFrame, experiment_number: int) -> None:
+def save_processed_data(data_frame: pandas.DataFrame, experiment_number: int, storage: str = "csv") -> None:
     """
-    Save a pandas DataFrame to a CSV file in the preprocessed data folder,
+    Save a pandas DataFrame to a file in the preprocessed data folder in the given storage format,
     number of experiment passed as argument,
     old data for the same experiment will be overwritten.
     """
-    file_path:str = os.path.dirname(os.path.realpath(__file__))  # Get the path of the current file
-    file_path = os.path.join(file_path, (r"Data\PreProcessed\Experiment"+str(experiment_number)+".csv"))
     try:
-        data_frame.to_csv(file_path, index=False)
+        _write_data_frame(data_frame, experiment_file_path(experiment_number, False, storage), storage)
     except Exception:
-        print("save_processed_csv failed.") # We can continue execution, but the data will be lost.
+        print("save_processed_data failed.") # We can continue execution, but the data will be lost.
+
+
+def read_experiment_csv(experiment_number: int, raw: bool) -> pandas.DataFrame:
+    """
+    Read a experiment data file,
+    number of experiment passed as argument,
+    raw flag indicates if raw or preprocessed data should be read,
+    returns a pandas DataFrame.
+    """
+    return read_experiment_data(experiment_number, raw, "csv")
+
+
+def save_processed_csv(data_frame: pandas.DataFrame, experiment_number: int) -> None:
+    """
+    Save a pandas DataFrame to a CSV file in the preprocessed data folder,
+    number of experiment passed as argument,
+    old data for the same experiment will be overwritten.
+    """
+    save_processed_data(data_frame, experiment_number, "csv")
+
+
+def convert_experiment_files(storage: str, raw: bool = True) -> None:
+    """
+    One-shot conversion of all CSV experiment files in Raw or PreProcessed folder to a binary storage format,
+    CSV files are kept for interchange.
+    """
+    for experiment_number in list_experiment_numbers(raw, "csv"):
+        data_frame = read_experiment_data(experiment_number, raw, "csv")
+        _write_data_frame(data_frame, experiment_file_path(experiment_number, raw, storage), storage)
 
 
 def remove_background_temperature(data_frame: pandas.DataFrame) -> None:
@@ -47,18 +141,40 @@ def remove_background_temperature(data_frame: pandas.DataFrame) -> None:
     data_frame = data_frame.drop(LABEL_BACKGROUND_TEMP, axis='columns')
 
 
-def remove_invalid_magnetic_increases(data_frame: pandas.DataFrame) -> None:
+def remove_invalid_magnetic_increases(data_frame: pandas.DataFrame, group_label: Optional[str] = None,
+                                      initial_minimum: Union[float, dict] = numpy.inf) -> pandas.DataFrame:
     """
-    Removes invalid increases in magnetic field strength from dataframe.
+    Removes invalid increases in magnetic field strength from dataframe, returns the filtered dataframe.
     Magnetic field should weaken with time as temeperature increases, an increase indicates invalid readings.
     Outliers should be removed before calling this function, they could introduce false minimas.
+    A row is valid if it is not above the running minimum of the field strength (single cummin pass),
+    with group_label the running minimum is computed separately for each experiment of a long-format frame.
+    initial_minimum carries the running minimum from previous chunks of a stream (a dict per group if grouped).
     """
-    current_minimum_strength = data_frame.iloc[0][LABEL_MAGNETIC_FIELD]
-    for index, row in data_frame.iterrows():
-        if row[LABEL_MAGNETIC_FIELD] < current_minimum_strength:
-            current_minimum_strength = row[LABEL_MAGNETIC_FIELD]
-        elif row[LABEL_MAGNETIC_FIELD] > current_minimum_strength:
-            data_frame.drop(index, inplace=True)
+    magnetic_field:pandas.Series = data_frame[LABEL_MAGNETIC_FIELD]
+    if group_label is None:
+        running_minimum = numpy.minimum(magnetic_field.cummin(), initial_minimum)
+    else:
+        groups = data_frame[group_label]
+        carried_minimum = groups.map(initial_minimum if isinstance(initial_minimum, dict) else {}).fillna(numpy.inf)
+        running_minimum = numpy.minimum(magnetic_field.groupby(groups, sort=False).cummin(), carried_minimum)
+    return data_frame[~(magnetic_field > running_minimum)]
+
+
+def remove_invalid_magnetic_increases_streamed(chunks: Iterable[pandas.DataFrame],
+                                               group_label: Optional[str] = None) -> Iterator[pandas.DataFrame]:
+    """
+    Applies remove_invalid_magnetic_increases to a stream of chunks (e.g. pandas.read_csv with chunksize),
+    carrying the running minimum across chunk boundaries, yields filtered chunks.
+    """
+    running_minimum: Union[float, dict] = numpy.inf if group_label is None else {}
+    for chunk in chunks:
+        yield remove_invalid_magnetic_increases(chunk, group_label, running_minimum)
+        if group_label is None:
+            running_minimum = min(running_minimum, chunk[LABEL_MAGNETIC_FIELD].min(skipna=True))
+        else:
+            for group, minimum in chunk.groupby(group_label, sort=False)[LABEL_MAGNETIC_FIELD].min().items():
+                running_minimum[group] = min(running_minimum.get(group, numpy.inf), minimum)
 
 
 def polynomial_fit(data_frame: pandas.DataFrame, x_label: str, y_label: str,
@@ -76,6 +192,56 @@ def polynomial_fit(data_frame: pandas.DataFrame, x_label: str, y_label: str,
     return coeffs.tolist()
 
 
+def grouped_polynomial_fit(data_frame: pandas.DataFrame, x_label: str, y_label: str,
+                           degree: int, group_label: str) -> pandas.DataFrame:
+    """
+    Fits a polynomial of a given degree separately for each group (experiment) of a long-format dataframe.
+    Returns a table of coefficients indexed by group, columns are powers in polyfit order (highest first),
+    so a row equals polynomial_fit of that group. Groups with too few points or too few distinct x values
+    (e.g. constant current) get NaN coefficients, the other groups are still fitted.
+    All groups are solved at once: per-group normal equations are accumulated with bincount,
+    x is centered and scaled per group to keep them well conditioned.
+    """
+    import pandas
+    codes, groups = pandas.factorize(data_frame[group_label], sort=True)
+    group_count = len(groups)
+    x = data_frame[x_label].to_numpy(dtype=float)
+    y = data_frame[y_label].to_numpy(dtype=float)
+    counts = numpy.bincount(codes, minlength=group_count)
+    # Center and scale x in each group, polynomial in t = (x - center) / scale is fitted
+    center = numpy.bincount(codes, weights=x, minlength=group_count) / numpy.maximum(counts, 1)
+    t = x - center[codes]
+    scale = numpy.zeros(group_count)
+    numpy.maximum.at(scale, codes, numpy.abs(t))
+    scale[scale <= 1e-12 * numpy.abs(center)] = 1.  # Single distinct x (up to rounding), left singular
+    t /= scale[codes]
+    # Normal equations: Gram matrix is Hankel in power sums of t, right side are sums of y * t^k
+    powers = numpy.ones_like(t)
+    power_sums = numpy.empty((group_count, 2 * degree + 1))
+    moments = numpy.empty((group_count, degree + 1))
+    for k in range(2 * degree + 1):
+        power_sums[:, k] = numpy.bincount(codes, weights=powers, minlength=group_count)
+        if k <= degree:
+            moments[:, k] = numpy.bincount(codes, weights=powers * y, minlength=group_count)
+        powers = powers * t
+    index = numpy.add.outer(numpy.arange(degree + 1), numpy.arange(degree + 1))
+    gram = power_sums[:, index]
+    valid = counts > degree
+    valid[valid] = numpy.linalg.cond(gram[valid]) < 1e10   # Rank-deficient groups would make the whole batch fail
+    gram[~valid] = numpy.eye(degree + 1)    # Placeholder, keeps the batch solvable
+    scaled_coefficients = numpy.linalg.solve(gram, moments[..., None])[..., 0]
+    # Back to powers of x: sum_k a_k ((x - c) / s)^k, expanded with the binomial theorem
+    coefficients = numpy.zeros((group_count, degree + 1))
+    for k in range(degree + 1):
+        term = scaled_coefficients[:, k] / scale ** k
+        for j in range(k + 1):
+            coefficients[:, j] += term * math.comb(k, j) * (-center) ** (k - j)
+    coefficients[~valid] = numpy.nan
+    table = pandas.DataFrame(coefficients[:, ::-1], index=pandas.Index(groups, name=group_label),
+                             columns=list(range(degree, -1, -1)))
+    return table
+
+
 def remove_outliers(data_frame: pandas.DataFrame, x_label: str, y_label: str,
                     coefficents:list[float], threshold: float = 3.0 ) -> pandas.DataFrame:
     """
@@ -99,6 +265,128 @@ def remove_outliers(data_frame: pandas.DataFrame, x_label: str, y_label: str,
     return data_frame[non_outliers]
 
 
+OUTLIER_METHODS:tuple[str, ...] = ("fit", "sigma_clip", "ransac")
+
+
+def _scaled_vandermonde(x: numpy.ndarray, degree: int) -> numpy.ndarray:
+    """
+    Design matrix with columns t^0 ... t^degree, where t is x centered and scaled to [-1, 1].
+    """
+    t = x - x.mean()
+    scale = numpy.abs(t).max()
+    return numpy.vander(t / scale if scale > 0 else t, degree + 1, increasing=True)
+
+
+def _sigma_clip(design: numpy.ndarray, y: numpy.ndarray, keep: numpy.ndarray,
+                threshold: float, max_passes: int) -> tuple[numpy.ndarray, list[int]]:
+    """
+    Iterative sigma clipping, refits on kept points and removes points above threshold residual stds until none are.
+    Normal equations and residual sum of squares are downdated with the removed points only,
+    the design matrix is built once. Returns the kept mask and number of points removed per pass.
+    """
+    kept_design = design[keep]
+    gram = kept_design.T @ kept_design
+    moments = kept_design.T @ y[keep]
+    sum_squares = y[keep] @ y[keep]
+    count = int(keep.sum())
+    removed_per_pass:list[int] = []
+    for _ in range(max_passes):
+        if count <= design.shape[1]:
+            break
+        coefficients = numpy.linalg.solve(gram, moments)
+        residual_sum_squares = sum_squares - 2 * coefficients @ moments + coefficients @ gram @ coefficients
+        std_residuals = numpy.sqrt(max(residual_sum_squares, 0.0) / count)
+        removed = keep & (numpy.abs(y - design @ coefficients) > threshold * std_residuals)
+        removed_count = int(removed.sum())
+        if removed_count == 0:
+            break
+        removed_per_pass.append(removed_count)
+        removed_design = design[removed]
+        gram -= removed_design.T @ removed_design
+        moments -= removed_design.T @ y[removed]
+        sum_squares -= y[removed] @ y[removed]
+        count -= removed_count
+        keep = keep & ~removed
+    return keep, removed_per_pass
+
+
+def _ransac(design: numpy.ndarray, y: numpy.ndarray, threshold: float, iterations: int,
+            sample_size: int, rng: numpy.random.Generator) -> numpy.ndarray:
+    """
+    RANSAC consensus set, all hypotheses (exact fits through random minimal samples) are evaluated at once.
+    Hypotheses are scored by the median absolute residual on a random subsample of at most sample_size points,
+    leaving out the hypothesis' own sample points (their residuals are exactly 0).
+    Consensus of the best are points within threshold robust standard deviations (1.4826 * median),
+    at least half of the points with the smallest residuals. The consensus is refitted and points are kept
+    within threshold noise scales of the refit, where the scale is at least the residual std of the points
+    within twice the threshold, so nearly exact (e.g. quantised) or slightly curved data keeps its points.
+    """
+    point_count, parameter_count = design.shape
+    samples = rng.integers(0, point_count, size=(iterations, parameter_count))
+    sample_design = design[samples]
+    solvable = numpy.abs(numpy.linalg.det(sample_design)) > 1e-12  # Repeated points give singular samples
+    if not solvable.any():
+        return numpy.ones(point_count, dtype=bool)
+    samples, sample_design = samples[solvable], sample_design[solvable]
+    hypotheses = numpy.linalg.solve(sample_design, y[samples][..., None])[..., 0]
+    subsample = rng.integers(0, point_count, size=min(point_count, sample_size))
+    residuals = numpy.abs(y[subsample, None] - design[subsample] @ hypotheses.T)
+    own_samples = (subsample[:, None, None] == samples[None, :, :]).any(axis=2)
+    residuals[own_samples] = numpy.nan
+    median_residuals = numpy.nanmedian(residuals, axis=0)
+    best = numpy.nanargmin(median_residuals)
+    robust_std = 1.4826 * median_residuals[best]
+
+    best_residuals = numpy.abs(y - design @ hypotheses[best])
+    consensus = best_residuals <= threshold * robust_std
+    minimum_size = max(parameter_count + 1, -(-point_count // 2))
+    if consensus.sum() < minimum_size:
+        consensus = numpy.zeros(point_count, dtype=bool)
+        consensus[numpy.argsort(best_residuals, kind="stable")[:minimum_size]] = True
+    coefficients = numpy.linalg.lstsq(design[consensus], y[consensus], rcond=None)[0]
+    refit_residuals = y - design @ coefficients
+    # The median based scales underestimate the noise of nearly exact or slightly curved data,
+    # the band of twice the threshold is refitted until it stops growing and its residual std is the floor
+    scale = max(robust_std, 1.4826 * numpy.median(numpy.abs(refit_residuals)))
+    band = numpy.abs(refit_residuals) <= 2 * threshold * scale
+    for _ in range(point_count):
+        coefficients = numpy.linalg.lstsq(design[band], y[band], rcond=None)[0]
+        refit_residuals = y - design @ coefficients
+        band_residuals = refit_residuals[band]
+        scale = max(scale, numpy.sqrt(band_residuals @ band_residuals / max(int(band.sum()) - parameter_count, 1)))
+        grown_band = band | (numpy.abs(refit_residuals) <= 2 * threshold * scale)
+        if grown_band.sum() == band.sum():
+            break
+        band = grown_band
+    return numpy.abs(refit_residuals) <= threshold * scale
+
+
+def remove_outliers_robust(data_frame: pandas.DataFrame, x_label: str, y_label: str, degree: int = 1,
+                           threshold: float = 3.0, method: str = "ransac", max_passes: int = 10,
+                           ransac_iterations: int = 100, ransac_sample_size: int = 10000,
+                           seed: Optional[int] = None) -> tuple[pandas.DataFrame, list[int]]:
+    """
+    Removes points far away from a polynomial fit that is not contaminated by the outliers themselves.
+    sigma_clip method refits and removes points above threshold residual stds until no point is removed,
+    ransac method first keeps the RANSAC consensus set and then sigma clips it.
+    Returns the dataframe without outliers and the number of points removed per pass
+    (with ransac the first pass is the RANSAC step).
+    """
+    if method not in ("sigma_clip", "ransac"):
+        raise ValueError("Unknown outlier method "+method+", available: sigma_clip, ransac")
+    x = data_frame[x_label].to_numpy(dtype=float)
+    y = data_frame[y_label].to_numpy(dtype=float)
+    y = y - y.mean() # Centering keeps the residual sum of squares accurate
+    design = _scaled_vandermonde(x, degree)
+    removed_per_pass:list[int] = []
+    keep = numpy.ones(len(x), dtype=bool)
+    if method == "ransac" and len(x) > degree + 1:
+        keep = _ransac(design, y, threshold, ransac_iterations, ransac_sample_size, numpy.random.default_rng(seed))
+        removed_per_pass.append(int(len(x) - keep.sum()))
+    keep, clip_passes = _sigma_clip(design, y, keep, threshold, max_passes)
+    return data_frame[keep], removed_per_pass + clip_passes
+
+
 def predict_value(slope:float, initial_x:int, initial_y:int, target_x:int) -> float:
     """
     Predicts the value of Y at a given X using the slope of the line.
@@ -106,52 +394,324 @@ def predict_value(slope:float, initial_x:int, initial_y:int, target_x:int) -> fl
     return initial_y + slope*(target_x - initial_x)
 
 
-def process_experiment_data(make_report:bool, polynomial_degree:int=1) -> float:
+def tail_file(file_path: str, poll_interval: float = 0.5,
+              stop: Optional[threading.Event] = None) -> Iterator[str]:
+    """
+    Yields lines of a file that is still being written by the rig, including lines appended later.
+    Polls for new data every poll_interval seconds until the stop event is set.
+    """
+    with open(file_path, encoding="utf-8") as file:
+        buffer = ""
+        while stop is None or not stop.is_set():
+            line = file.readline()
+            if not line:
+                time.sleep(poll_interval)
+                continue
+            buffer += line
+            if buffer.endswith("\n"): # Line may be only partially written yet
+                yield buffer
+                buffer = ""
+
+
+def parse_csv_lines(lines: Iterable[str]) -> Iterator[list[float]]:
+    """
+    Parses lines in the experiment CSV format (e.g. tail_file or socket.makefile()) into rows of numbers.
+    Header and malformed lines are skipped.
+    """
+    for fields in csv.reader(lines):
+        try:
+            yield [float(field) for field in fields]
+        except ValueError:
+            continue
+
+
+def stream_slopes(rows: Iterable[Union[Mapping, Sequence[float]]], outlier_threshold: float = 3.0,
+                  warmup: int = 10, forgetting_factor: float = 1.0,
+                  resolution: float = 1.0) -> Iterator[tuple[float, float]]:
+    """
+    Streaming version of the preprocessing, yields (time, current slope) after every sample.
+    Rows are mappings with the column labels or sequences in the experiment CSV column order.
+    Slope of magnetic field against current is fitted with recursive least squares, O(1) work per sample.
+    First warmup accepted samples are only fitted, they should be free of outliers.
+    Afterwards a sample is rejected as an outlier if its residual is above outlier_threshold standard deviations
+    of the residuals, then if it is above the running minimum of the magnetic field,
+    same rule as remove_invalid_magnetic_increases.
+    Residual standard deviation starts from the residuals of the warmup samples against the fit
+    and is updated with every later sample (residuals clipped at the outlier limit), it is never below
+    the quantisation noise of readings with the given resolution (resolution / sqrt(12)).
+    forgetting_factor below 1 makes the fit follow drifting relation, older samples are weighted down.
+    """
+    if warmup < 3:
+        raise ValueError("Warmup must have at least 3 samples, two are needed to fit the line.")
+    theta = numpy.zeros(2)           # slope, intercept
+    covariance = numpy.eye(2) * 1e6  # Large initial covariance, fit is driven by the data
+    current_offset = None            # Current is centered on the first sample for numerical stability
+    warmup_samples:list[tuple[float, float]] = []
+    residual_count = 0
+    residual_mean_square = 0.0
+    minimum_variance = resolution ** 2 / 12
+    running_minimum = numpy.inf
+    for row in rows:
+        if isinstance(row, Mapping):
+            t, current, magnetic_field = row[LABEL_TIME], row[LABEL_CURRENT], row[LABEL_MAGNETIC_FIELD]
+        else:
+            t, current, magnetic_field = row[0], row[1], row[2]
+        if current_offset is None:
+            current_offset = current
+        phi = numpy.array([current - current_offset, 1.0])
+        residual = magnetic_field - phi @ theta
+        # Outliers are checked before the running minimum so they do not introduce false minimas
+        is_outlier = False
+        if residual_count > 0:
+            limit = outlier_threshold * numpy.sqrt(max(residual_mean_square, minimum_variance))
+            is_outlier = abs(residual) > limit
+            # Running mean square of the residuals clipped at the limit: an isolated outlier barely changes it,
+            # but a drifting relation widens it instead of every following sample being rejected
+            residual_count += 1
+            residual_mean_square += (min(residual ** 2, limit ** 2) - residual_mean_square) / residual_count
+        if not is_outlier and magnetic_field <= running_minimum:
+            running_minimum = magnetic_field
+            gain = covariance @ phi / (forgetting_factor + phi @ covariance @ phi)
+            theta = theta + gain * residual
+            covariance = (covariance - numpy.outer(gain, phi @ covariance)) / forgetting_factor
+            if residual_count == 0:
+                warmup_samples.append((phi[0], magnetic_field))
+                if len(warmup_samples) == warmup:
+                    # Residual statistics start from the fitted warmup samples, 2 degrees of freedom are used by the fit
+                    samples = numpy.array(warmup_samples)
+                    warmup_residuals = samples[:, 1] - (samples[:, 0] * theta[0] + theta[1])
+                    residual_count = warmup - 2
+                    residual_mean_square = float(warmup_residuals @ warmup_residuals) / residual_count
+                    warmup_samples.clear()
+        yield t, theta[0]
+
+
+def process_single_experiment(experiment_number:int, make_report:bool, polynomial_degree:int=1,
+                              storage:str="csv", outlier_threshold:float=3.0, make_plots:bool=True,
+                              outlier_method:str="fit") -> float:
+    """
+    Preprocess the data of a single experiment from Raw folder and save it to PreProcessed folder.
+    Removing background temperature, invalid magnetic field increases and outliers.
+    Slope of the line of best fit is returned.
+    Without make_plots flag matplotlib is never imported, fast path when only the slope is needed.
+    outlier_method is one of OUTLIER_METHODS, fit removes outliers once against the initial line of best fit,
+    sigma_clip and ransac use remove_outliers_robust, the number of outliers removed per pass is printed.
+    """
+    data_frame = read_experiment_data(experiment_number, True, storage)
+    if make_report:
+        exploratory_analysis_report(data_frame)
+    remove_background_temperature(data_frame)
+    polynomial_coefficents = polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, 1)
+    if make_plots:
+        graph_polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_coefficents, title="Initial data with line of best fit for outlier removal")
+    if outlier_method == "fit":
+        data_frame = remove_outliers(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_coefficents, outlier_threshold)
+    else:
+        data_frame, removed_per_pass = remove_outliers_robust(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, 1,
+                                                              outlier_threshold, outlier_method, seed=experiment_number)
+        print("Experiment "+str(experiment_number)+" "+outlier_method+" removed outliers per pass: "+str(removed_per_pass))
+    data_frame = remove_invalid_magnetic_increases(data_frame)
+    polynomial_coefficents = polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_degree)
+    if make_plots:
+        graph_polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_coefficents, title=("Data after preprocessing with line of best fit: "+(', '.join(f"{num:.3f}" for num in polynomial_coefficents))))
+    save_processed_data(data_frame, experiment_number, storage)
+    return polynomial_coefficents[0]
+
+
+def _init_worker() -> None:
+    """
+    Worker processes only save plots, so they use the non-interactive backend.
+    """
+    os.environ["MPLBACKEND"] = "Agg"    # Used when matplotlib is first imported in the worker
+    if "matplotlib.pyplot" in sys.modules:  # Already imported by a forked parent
+        sys.modules["matplotlib.pyplot"].switch_backend("Agg")
+
+
+def _process_in_worker(*args) -> float:
+    """
+    process_single_experiment for worker processes, which exit without running atexit handlers,
+    so queued plots are flushed before the result is returned.
+    """
+    try:
+        return process_single_experiment(*args)
+    finally:
+        flush_plots()
+
+
+MANIFEST_PATH:str = os.path.join(DATA_FOLDER, "PreProcessed", "manifest.json")
+
+
+def file_hash(file_path: str) -> str:
+    """
+    SHA-256 of the file contents, read in blocks so long recordings are not loaded at once.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest() -> dict:
+    """
+    Load the manifest of processed experiments: raw file hash, processing parameters and slope per experiment.
+    Missing or corrupted manifest is treated as empty, so everything gets reprocessed.
+    """
+    try:
+        with open(MANIFEST_PATH) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError):
+        print("load_manifest failed, all experiments will be reprocessed.")
+        return {}
+
+
+def save_manifest(manifest: dict) -> None:
+    """
+    Save the manifest, written to a temporary file first so an interrupted run never leaves it corrupted.
+    """
+    temporary_path = MANIFEST_PATH + ".tmp"
+    try:
+        with open(temporary_path, "w") as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, MANIFEST_PATH)
+    except Exception:
+        print("save_manifest failed.") # Next run will reprocess the experiments.
+
+
+def process_experiment_data(make_report:bool, polynomial_degree:int=1, parallel:bool=False,
+                            max_workers:Optional[int]=None, storage:str="csv", outlier_threshold:float=3.0,
+                            incremental:bool=True, make_plots:bool=True, outlier_method:str="fit") -> float:
     """
     Preprocess the experiment data for each file in Raw folder.
     Removing background temperature, invalid magnetic field increases and outliers.
     Average slope of the line of best fit for each experiment is returned.
+    With parallel flag experiments are processed in a pool of max_workers processes (default: number of cores),
+    slopes are averaged in experiment order, so the result does not depend on the order of completion.
+    Failure of an experiment is reported and the remaining experiments are still processed.
+    Raw data is read from and preprocessed data saved to files in the given storage format.
+    With incremental flag experiments whose raw file hash and processing parameters match the manifest
+    are skipped and their cached slope is reused.
+    Without make_plots flag no plots are drawn and matplotlib is not imported.
     """
-    folder_path:str = os.path.dirname(os.path.realpath(__file__))  # Get the current files path
-    folder_path = os.path.join(folder_path, r"Data\Raw")
-    experiments_coefficients:list[float] = []
+    if outlier_method not in OUTLIER_METHODS:
+        raise ValueError("Unknown outlier method "+outlier_method+", available: "+", ".join(OUTLIER_METHODS))
+    parameters = {"polynomial_degree": polynomial_degree, "outlier_threshold": outlier_threshold, "storage": storage,
+                  "outlier_method": outlier_method}
+    manifest = load_manifest()
+    slopes:dict[int, float] = {}
+    raw_hashes:dict[int, str] = {}
+    for i in list_experiment_numbers(True, storage):
+        raw_hashes[i] = file_hash(experiment_file_path(i, True, storage))
+        entry = manifest.get(str(i))
+        if (incremental and entry is not None and entry["raw_hash"] == raw_hashes[i]
+                and entry["parameters"] == parameters and os.path.isfile(experiment_file_path(i, False, storage))):
+            slopes[i] = entry["slope"]
+    experiment_numbers = [i for i in raw_hashes if i not in slopes]
+
+    new_slopes:dict[int, float] = {}
+    if parallel and experiment_numbers:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(_process_in_worker, i, make_report, polynomial_degree, storage,
+                                       outlier_threshold, make_plots, outlier_method): i
+                       for i in experiment_numbers}
+            for future in as_completed(futures):
+                try:
+                    new_slopes[futures[future]] = future.result()
+                except Exception as error:
+                    print("process_experiment_data failed for experiment "+str(futures[future])+": "+repr(error))
+    else:
+        for i in experiment_numbers:
+            try:
+                new_slopes[i] = process_single_experiment(i, make_report, polynomial_degree, storage, outlier_threshold,
+                                                       make_plots, outlier_method)
+            except Exception as error:
+                print("process_experiment_data failed for experiment "+str(i)+": "+repr(error))
+    for i in experiment_numbers:
+        if i in new_slopes:
+            manifest[str(i)] = {"raw_hash": raw_hashes[i], "parameters": parameters, "slope": new_slopes[i]}
+        else:
+            manifest.pop(str(i), None)
+    save_manifest(manifest)
+    slopes.update(new_slopes)
+    if not slopes:
+        raise RuntimeError("process_experiment_data failed for all experiments.")
+    experiments_coefficients:list[float] = [slopes[i] for i in sorted(slopes)]
     average_coefficent:float = 0.0
-    for i in range(1,len(os.listdir(folder_path))+1):
-        data_frame = read_experiment_csv(i, True)
-        if make_report:
-            exploratory_analysis_report(data_frame)
-        remove_background_temperature(data_frame)
-        polynomial_coefficents = polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, 1)
-        graph_polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_coefficents, title="Initial data with line of best fit for outlier removal")
-        data_frame = remove_outliers(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_coefficents)
-        remove_invalid_magnetic_increases(data_frame)
-        polynomial_coefficents = polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_degree)
-        graph_polynomial_fit(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, polynomial_coefficents, title=("Data after preprocessing with line of best fit: "+(', '.join(f"{num:.3f}" for num in polynomial_coefficents))))
-        save_processed_csv(data_frame, i)
-        experiments_coefficients.append(polynomial_coefficents[0])
     for coeff in experiments_coefficients:
         average_coefficent += coeff
     average_coefficent /= len(experiments_coefficients)
     return average_coefficent
 
 
-def exploratory_analysis_report(data_frame: pandas.DataFrame) -> None:
+REPORTS_FOLDER:str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "Reports")
+
+
+def data_frame_hash(data_frame: pandas.DataFrame) -> str:
+    """
+    SHA-256 of the dataframe contents, column names and dtypes, computed without serialising the frame.
+    """
+    import pandas
+    digest = hashlib.sha256()
+    digest.update(repr([(str(column), str(dtype)) for column, dtype in data_frame.dtypes.items()]).encode())
+    digest.update(pandas.util.hash_pandas_object(data_frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def exploratory_analysis_report(data_frame: pandas.DataFrame, minimal: bool = False,
+                                sample_size: Optional[int] = 100000, seed: int = 0) -> str:
+    """
+    Generate a pandas-profiling report for the data, returns the path of the report.
+    Report is saved as a HTML file in the Reports folder, named by the hash of the data and the report options,
+    an existing report for the same data is reused instead of being generated again.
+    minimal flag skips correlations and interactions, frames longer than sample_size are randomly sampled.
+    """
+    key = data_frame_hash(data_frame)[:16] + ("_minimal" if minimal else "")
+    if sample_size is not None and len(data_frame) > sample_size:
+        key += "_sample"+str(sample_size)+"_seed"+str(seed)
+        data_frame = data_frame.sample(sample_size, random_state=seed).sort_index()
+    file_path = os.path.join(REPORTS_FOLDER, "report_"+key+".html")
+    if os.path.isfile(file_path):
+        return file_path
+    from ydata_profiling import ProfileReport   # Newer version of pandas-profiling
+    os.makedirs(REPORTS_FOLDER, exist_ok=True)
+    report = ProfileReport(data_frame, minimal=minimal, progress_bar=False)
+    temporary_path = file_path[:-len(".html")]+"."+str(os.getpid())+".tmp.html"
+    report.to_file(temporary_path)
+    os.replace(temporary_path, file_path) # Report appears complete or not at all, never half written
+    return file_path
+
+
+def _experiment_report(experiment_number: int, storage: str, minimal: bool, sample_size: Optional[int]) -> str:
+    """
+    Report of a raw experiment file, run in worker processes.
+    """
+    return exploratory_analysis_report(read_experiment_data(experiment_number, True, storage), minimal, sample_size)
+
+
+def generate_experiment_reports(experiment_numbers: Optional[Iterable[int]] = None, minimal: bool = False,
+                                sample_size: Optional[int] = 100000, max_workers: Optional[int] = None,
+                                storage: str = "csv") -> dict[int, str]:
     """
-    Generate a pandas-profiling report for the data.
-    Report will be saved as a HTML file in the Reports folder, with a number after the previous file.
+    Generate reports of raw experiment data (all experiments by default) in a pool of max_workers processes.
+    Returns paths of the reports by experiment number, failures are reported and skipped.
     """
-    file_path:str = os.path.dirname(os.path.realpath(__file__))  # Get the path of the current file
-    report_number = 1
-    file_path = os.path.join(file_path, "Reports")
-    while os.path.isfile(os.path.join(file_path, "report"+str(report_number)+".html")):
-        report_number += 1
-    file_path = os.path.join(file_path, "report"+str(report_number)+".html")
-    report = ProfileReport(data_frame)
-    report.to_file(file_path)
+    if experiment_numbers is None:
+        experiment_numbers = list_experiment_numbers(True, storage)
+    report_paths:dict[int, str] = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(_experiment_report, i, storage, minimal, sample_size): i for i in experiment_numbers}
+        for future in as_completed(futures):
+            try:
+                report_paths[futures[future]] = future.result()
+            except Exception as error:
+                print("generate_experiment_reports failed for experiment "+str(futures[future])+": "+repr(error))
+    return report_paths
 
 
 if __name__ == "__main__":
-    averageCoefficent = process_experiment_data(make_report=False)
+    averageCoefficent = process_experiment_data(make_report=False, parallel=True)
     print("Average slope of the line of best fit across all experiments: "+ str(averageCoefficent))
     experimentDF = read_experiment_csv(5, False)
     predictX = experimentDF.iloc[0][LABEL_CURRENT]
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+PROJECT_FOLDER:str = os.path.dirname(os.path.realpath(__file__))
+IMPORT_TIME_THRESHOLD:float = 0.5   # Seconds, slope-only runs should start well under a second
+
+
+def measure_import_time(module: str, runs: int = 5) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Measure the import time of a module with python -X importtime in a fresh interpreter.
+    Returns the best cumulative import time in seconds across runs,
+    and the (cumulative seconds, module name) of every import in the best run, slowest first.
+    """
+    best_time = float("inf")
+    best_imports:list[tuple[float, str]] = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import "+module],
+                                cwd=PROJECT_FOLDER, capture_output=True, text=True, check=True)
+        imports:list[tuple[float, str]] = []
+        module_time = None
+        # Lines have the format: "import time: self [us] | cumulative | imported package"
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imports.append((int(cumulative) / 1e6, name.strip()))
+            if name.strip() == module:
+                module_time = int(cumulative) / 1e6
+        if module_time is None:
+            raise RuntimeError("measure_import_time failed, "+module+" not found in the importtime output.")
+        if module_time < best_time:
+            best_time = module_time
+            best_imports = sorted(imports, reverse=True)
+    return best_time, best_imports
+
+
+if __name__ == "__main__":
+    # Usage: python benchmark_import_time.py [module] [threshold in seconds]
+    module = sys.argv[1] if len(sys.argv) > 1 else "ProcessData"
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_TIME_THRESHOLD
+    import_time, slowest_imports = measure_import_time(module)
+    print("Import time of "+module+": "+f"{import_time:.3f}"+" s (threshold "+f"{threshold:.3f}"+" s)")
+    print("Slowest imports:")
+    for cumulative, name in slowest_imports[:10]:
+        print(f"  {cumulative:.3f} s  {name}")
+    if import_time > threshold:
+        print("Import time regression, heavy modules should be imported on first use.")
+        sys.exit(1)
@@ -0,0 +1,100 @@
+"""Testing script for the graphing."""
+
+import os
+
+import matplotlib
+import matplotlib.pyplot
+import numpy
+import pytest
+
+import Graphing
+
+matplotlib.use("Agg")
+
+
+@pytest.fixture
+def plots_folder(tmp_path, monkeypatch):
+    """
+    Empty Plots folder in place of the project one, numbering starts from a fresh scan.
+    """
+    monkeypatch.setattr(Graphing, "PLOTS_FOLDER", str(tmp_path))
+    monkeypatch.setattr(Graphing, "_next_plot_number", None)
+    return tmp_path
+
+
+def save_plot() -> None:
+    matplotlib.pyplot.plot([0, 1], [1, 0])
+    Graphing.show_or_save(False)
+
+
+def test_show_or_save_numbering(plots_folder, monkeypatch):
+    for name in ("Plot3.png", "Plot10.png", "Plot.png", "PlotA.png", "notes.txt"):
+        (plots_folder / name).touch()
+    listdir_calls = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: listdir_calls.append(path) or listdir(path))
+    save_plot()
+    save_plot()
+    Graphing.flush_plots()
+    assert (plots_folder / "Plot11.png").is_file() and (plots_folder / "Plot12.png").is_file()
+    assert len(listdir_calls) == 1   # Folder is scanned once, later numbers come from the counter
+
+
+def test_show_or_save_skips_claimed_numbers(plots_folder):
+    save_plot()
+    # Another process claims the next number in the meantime
+    (plots_folder / "Plot2.png").touch()
+    save_plot()
+    Graphing.flush_plots()
+    assert sorted(os.listdir(plots_folder)) == ["Plot1.png", "Plot2.png", "Plot3.png"]
+    assert (plots_folder / "Plot2.png").stat().st_size == 0
+
+
+def test_flush_plots_writes_all_figures(plots_folder):
+    for _ in range(5):
+        save_plot()
+    Graphing.flush_plots()
+    assert Graphing._plot_queue.unfinished_tasks == 0
+    assert matplotlib.pyplot.get_fignums() == []   # Saved figures are detached from pyplot
+    for number in range(1, 6):
+        with open(plots_folder / ("Plot"+str(number)+".png"), "rb") as file:
+            assert file.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def noisy_series(length: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+    rng = numpy.random.default_rng(length)
+    x = numpy.cumsum(rng.uniform(0.5, 1.5, length))
+    return x, numpy.sin(x / 50) + rng.normal(0, 0.1, length)
+
+
+@pytest.mark.parametrize("length, pointCount", [(10000, 500), (1001, 3), (5000, 4999)])
+def test_lttb_downsample(length, pointCount):
+    x, y = noisy_series(length)
+    indices = Graphing.lttb_downsample(x, y, pointCount)
+    assert len(indices) == pointCount
+    assert indices[0] == 0 and indices[-1] == length - 1
+    assert numpy.all(numpy.diff(indices) > 0)
+
+
+@pytest.mark.parametrize("length, bucketCount", [(10000, 250), (1001, 7), (999, 1000)])
+def test_min_max_downsample(length, bucketCount):
+    x, y = noisy_series(length)
+    peaks = numpy.random.default_rng(0).choice(length, 5, replace=False)
+    y[peaks[:3]] = 100.
+    y[peaks[3:]] = -100.
+    indices = Graphing.min_max_downsample(y, bucketCount)
+    assert len(indices) <= 2 * bucketCount + 2
+    assert indices[0] == 0 and indices[-1] == length - 1
+    assert numpy.all(numpy.diff(indices) > 0)
+    assert set(peaks) <= set(indices)
+    assert y[indices].max() == y.max() and y[indices].min() == y.min()
+
+
+@pytest.mark.parametrize("method", Graphing.DOWNSAMPLE_METHODS)
+def test_downsample_for_plot(method):
+    x, y = noisy_series(100)
+    numpy.testing.assert_array_equal(Graphing.downsample_for_plot(x, y, 200, method), numpy.arange(100))
+    x, y = noisy_series(10000)
+    assert len(Graphing.downsample_for_plot(x, y, 200, method)) <= 200 + 2
+    with pytest.raises(ValueError):
+        Graphing.downsample_for_plot(x, y, 200, "every_nth")
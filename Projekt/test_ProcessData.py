@@ -0,0 +1,356 @@
+"""Testing script for the data processing."""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import types
+
+import numpy
+import pandas
+import pytest
+
+import ProcessData
+from benchmark_import_time import IMPORT_TIME_THRESHOLD, PROJECT_FOLDER, measure_import_time
+from Graphing import LABEL_CURRENT, LABEL_MAGNETIC_FIELD, LABEL_TIME
+from ProcessData import (
+    downcast_dtypes, read_experiment_data, remove_invalid_magnetic_increases,
+    remove_invalid_magnetic_increases_streamed, save_processed_data
+)
+
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    """
+    Empty Raw and PreProcessed folders in place of the project data.
+    """
+    (tmp_path / "Raw").mkdir()
+    (tmp_path / "PreProcessed").mkdir()
+    monkeypatch.setattr(ProcessData, "DATA_FOLDER", str(tmp_path))
+    monkeypatch.setattr(ProcessData, "MANIFEST_PATH", str(tmp_path / "PreProcessed" / "manifest.json"))
+    return tmp_path
+
+
+def iterrows_reference(data_frame: pandas.DataFrame) -> pandas.DataFrame:
+    """
+    Previous row by row implementation of remove_invalid_magnetic_increases.
+    """
+    data_frame = data_frame.copy()
+    current_minimum_strength = data_frame.iloc[0][LABEL_MAGNETIC_FIELD]
+    for index, row in data_frame.iterrows():
+        if row[LABEL_MAGNETIC_FIELD] < current_minimum_strength:
+            current_minimum_strength = row[LABEL_MAGNETIC_FIELD]
+        elif row[LABEL_MAGNETIC_FIELD] > current_minimum_strength:
+            data_frame.drop(index, inplace=True)
+    return data_frame
+
+
+def random_experiment(rng: numpy.random.Generator, length: int) -> pandas.DataFrame:
+    # Decreasing integer readings with ties and random increases
+    field = 4000 - numpy.cumsum(rng.integers(-2, 4, length))
+    return pandas.DataFrame({LABEL_TIME: numpy.arange(length), LABEL_CURRENT: 5000 - numpy.arange(length),
+                             LABEL_MAGNETIC_FIELD: field})
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_remove_invalid_magnetic_increases(seed):
+    data_frame = random_experiment(numpy.random.default_rng(seed), 200)
+    pandas.testing.assert_frame_equal(remove_invalid_magnetic_increases(data_frame), iterrows_reference(data_frame))
+
+
+def test_remove_invalid_magnetic_increases_grouped():
+    rng = numpy.random.default_rng(0)
+    experiments = [random_experiment(rng, length).assign(Experiment=number)
+                   for number, length in enumerate((50, 80, 30))]
+    # Rows of the experiments are interleaved, as in a long-format frame of simultaneous recordings
+    long_frame = pandas.concat(experiments, ignore_index=True).sort_values(LABEL_TIME, kind="stable")
+    result = remove_invalid_magnetic_increases(long_frame, "Experiment")
+    for number, experiment in long_frame.groupby("Experiment"):
+        pandas.testing.assert_frame_equal(result[result["Experiment"] == number], iterrows_reference(experiment))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 500])
+def test_remove_invalid_magnetic_increases_streamed(chunk_size):
+    data_frame = random_experiment(numpy.random.default_rng(1), 300)
+    chunks = (data_frame.iloc[start:start + chunk_size] for start in range(0, len(data_frame), chunk_size))
+    result = pandas.concat(remove_invalid_magnetic_increases_streamed(chunks))
+    pandas.testing.assert_frame_equal(result, iterrows_reference(data_frame))
+
+
+def test_remove_invalid_magnetic_increases_streamed_grouped():
+    rng = numpy.random.default_rng(2)
+    experiments = [random_experiment(rng, 100).assign(Experiment=number) for number in range(3)]
+    long_frame = pandas.concat(experiments, ignore_index=True).sort_values(LABEL_TIME, kind="stable")
+    chunks = (long_frame.iloc[start:start + 25] for start in range(0, len(long_frame), 25))
+    result = pandas.concat(remove_invalid_magnetic_increases_streamed(chunks, "Experiment"))
+    for number, experiment in long_frame.groupby("Experiment"):
+        pandas.testing.assert_frame_equal(result[result["Experiment"] == number], iterrows_reference(experiment))
+
+
+def test_downcast_dtypes():
+    data_frame = pandas.DataFrame({"small": numpy.array([1, 24, 30]), "large": numpy.array([0, 5000, 70000]),
+                                   "float": numpy.array([0.1, 1 / 3, 4000.123456789])})
+    result = downcast_dtypes(data_frame.copy())
+    assert [str(dtype) for dtype in result.dtypes] == ["int16", "int32", "float64"]
+    pandas.testing.assert_frame_equal(result, data_frame, check_dtype=False)
+    numpy.testing.assert_array_equal(result["float"].to_numpy(), data_frame["float"].to_numpy())
+
+
+@pytest.mark.parametrize("storage", ["csv", "npy", "parquet", "feather"])
+def test_storage_round_trip(data_folder, storage):
+    if storage in ("parquet", "feather"):
+        pytest.importorskip("pyarrow")
+    data_frame = random_experiment(numpy.random.default_rng(0), 50)
+    data_frame["Background Temperature T (°C)"] = numpy.linspace(20., 25., 50) / 3
+    save_processed_data(data_frame, 1, storage)
+    result = read_experiment_data(1, False, storage)
+    pandas.testing.assert_frame_equal(result, data_frame, check_dtype=False)
+    assert result[LABEL_MAGNETIC_FIELD].dtype == numpy.int16
+    assert result["Background Temperature T (°C)"].dtype == numpy.float64
+
+
+def write_raw_experiment(data_folder, experiment_number: int, seed: int) -> None:
+    data_frame = random_experiment(numpy.random.default_rng(seed), 40)
+    data_frame["Background Temperature T (°C)"] = 24
+    data_frame.to_csv(data_folder / "Raw" / ("Experiment"+str(experiment_number)+".csv"), index=False)
+
+
+@pytest.fixture
+def processed_experiments(data_folder, monkeypatch):
+    """
+    Three raw experiments, returns list of experiment numbers processed by process_single_experiment.
+    """
+    for experiment_number in (1, 2, 3):
+        write_raw_experiment(data_folder, experiment_number, experiment_number)
+    processed = []
+    process_single_experiment = ProcessData.process_single_experiment
+
+    def counting_process_single_experiment(experiment_number, *args):
+        processed.append(experiment_number)
+        return process_single_experiment(experiment_number, *args)
+
+    monkeypatch.setattr(ProcessData, "process_single_experiment", counting_process_single_experiment)
+    return processed
+
+
+def test_process_experiment_data_skips_unchanged(data_folder, processed_experiments):
+    slope = ProcessData.process_experiment_data(False, make_plots=False)
+    assert processed_experiments == [1, 2, 3]
+    assert sorted(ProcessData.load_manifest()) == ["1", "2", "3"]
+    processed_experiments.clear()
+    assert ProcessData.process_experiment_data(False, make_plots=False) == slope
+    assert processed_experiments == []
+    # Processed data removed, or processing without the manifest
+    (data_folder / "PreProcessed" / "Experiment2.csv").unlink()
+    ProcessData.process_experiment_data(False, make_plots=False)
+    assert processed_experiments == [2]
+    processed_experiments.clear()
+    assert ProcessData.process_experiment_data(False, make_plots=False, incremental=False) == slope
+    assert processed_experiments == [1, 2, 3]
+
+
+def test_process_experiment_data_reprocesses_changes(data_folder, processed_experiments):
+    ProcessData.process_experiment_data(False, make_plots=False)
+    processed_experiments.clear()
+    ProcessData.process_experiment_data(False, make_plots=False, outlier_threshold=2.5)
+    assert processed_experiments == [1, 2, 3]
+    processed_experiments.clear()
+    write_raw_experiment(data_folder, 3, 10)
+    ProcessData.process_experiment_data(False, make_plots=False, outlier_threshold=2.5)
+    assert processed_experiments == [3]
+    assert ProcessData.load_manifest()["3"]["raw_hash"] == ProcessData.file_hash(str(data_folder / "Raw" / "Experiment3.csv"))
+
+
+def test_process_experiment_data_drops_failed_experiments(data_folder, processed_experiments):
+    ProcessData.process_experiment_data(False, make_plots=False)
+    with open(data_folder / "Raw" / "Experiment2.csv", "a") as file:
+        file.write("1,2,3,4,5,6,7\n")
+    ProcessData.process_experiment_data(False, make_plots=False)
+    assert sorted(ProcessData.load_manifest()) == ["1", "3"]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="workers see the patched data folder only when forked")
+def test_process_experiment_data_parallel(data_folder, capsys):
+    for experiment_number in range(1, 6):
+        write_raw_experiment(data_folder, experiment_number, experiment_number)
+    with open(data_folder / "Raw" / "Experiment2.csv", "a") as file:
+        file.write("1,2,3,4,5,6,7\n")
+    serial_slope = ProcessData.process_experiment_data(False, make_plots=False, incremental=False)
+    assert "failed for experiment 2" in capsys.readouterr().out
+    serial_data = {i: read_experiment_data(i, False) for i in (1, 3, 4, 5)}
+    for i in (1, 3, 4, 5):
+        (data_folder / "PreProcessed" / ("Experiment"+str(i)+".csv")).unlink()
+
+    parallel_slope = ProcessData.process_experiment_data(False, parallel=True, max_workers=3, make_plots=False,
+                                                         incremental=False)
+    assert parallel_slope == serial_slope
+    assert "process_experiment_data failed for experiment 2" in capsys.readouterr().out
+    assert sorted(ProcessData.load_manifest()) == ["1", "3", "4", "5"]
+    for i, data_frame in serial_data.items():
+        pandas.testing.assert_frame_equal(read_experiment_data(i, False), data_frame)
+
+
+def test_load_manifest_corrupted(data_folder):
+    assert ProcessData.load_manifest() == {}
+    with open(ProcessData.MANIFEST_PATH, "w") as file:
+        file.write("{not json")
+    assert ProcessData.load_manifest() == {}
+
+
+def hall_recording(rng: numpy.random.Generator, length: int, outliers: int) -> tuple[pandas.DataFrame, numpy.ndarray]:
+    """
+    Synthetic recording with B = 0.25 I + noise and injected outliers at 60 noise standard deviations below.
+    """
+    current = numpy.linspace(5000., 3000., length)
+    field = 0.25 * current + 2800 + rng.normal(0., 0.5, length)
+    outlier_rows = rng.choice(numpy.arange(20, length), outliers, replace=False)
+    field[outlier_rows] -= 30.
+    data_frame = pandas.DataFrame({LABEL_TIME: numpy.arange(length, dtype=float), LABEL_CURRENT: current,
+                                   LABEL_MAGNETIC_FIELD: field})
+    return data_frame, outlier_rows
+
+
+def test_stream_slopes_rejects_outliers():
+    data_frame, outlier_rows = hall_recording(numpy.random.default_rng(0), 2000, 40)
+    slopes = numpy.array([slope for _, slope in ProcessData.stream_slopes(data_frame.itertuples(index=False))])
+    assert len(slopes) == len(data_frame)
+    # An accepted outlier would set a false minimum, the slope then collapses for the following samples
+    assert abs(slopes[-1] - 0.25) < 1e-3
+    # Same result as the batch preprocessing without the outliers
+    clean = remove_invalid_magnetic_increases(data_frame.drop(index=outlier_rows))
+    batch_slope = ProcessData.polynomial_fit(clean, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, 1)[0]
+    assert abs(slopes[-1] - batch_slope) < 1e-3
+
+
+def test_stream_slopes_matches_batch_on_clean_data():
+    data_frame, _ = hall_recording(numpy.random.default_rng(1), 500, 0)
+    rows = data_frame.to_dict("records")
+    _, slope = list(ProcessData.stream_slopes(rows))[-1]
+    batch_slope = ProcessData.polynomial_fit(remove_invalid_magnetic_increases(data_frame),
+                                             LABEL_CURRENT, LABEL_MAGNETIC_FIELD, 1)[0]
+    assert abs(slope - batch_slope) < 1e-4
+
+
+@pytest.mark.parametrize("degree", [1, 2, 3])
+def test_grouped_polynomial_fit(degree):
+    rng = numpy.random.default_rng(degree)
+    frames = []
+    for group in range(20):
+        current = rng.uniform(3000., 5000., rng.integers(5, 50))
+        field = numpy.polyval(rng.normal(size=degree + 1) * 10.0 ** -numpy.arange(degree, -1, -1), current / 1000)
+        frames.append(pandas.DataFrame({"Experiment": group, LABEL_CURRENT: current,
+                                        LABEL_MAGNETIC_FIELD: field + rng.normal(0., 0.1, len(current))}))
+    frames.append(pandas.DataFrame({"Experiment": 20, LABEL_CURRENT: [4000.] * 10,
+                                    LABEL_MAGNETIC_FIELD: rng.normal(size=10)}))   # Constant current
+    frames.append(pandas.DataFrame({"Experiment": 21, LABEL_CURRENT: [4000., 4001.][:degree],
+                                    LABEL_MAGNETIC_FIELD: [1., 2.][:degree]}))     # Too few points
+    narrow_current = rng.uniform(0., 0.01, 50)
+    frames.append(pandas.DataFrame({"Experiment": 22, LABEL_CURRENT: narrow_current,   # Span under 1
+                                    LABEL_MAGNETIC_FIELD: 3 * narrow_current + 1 + rng.normal(0., 1e-4, 50)}))
+    long_frame = pandas.concat(frames, ignore_index=True).sample(frac=1., random_state=0)
+
+    table = ProcessData.grouped_polynomial_fit(long_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, degree, "Experiment")
+    assert list(table.columns) == list(range(degree, -1, -1))
+    assert list(table.index) == list(range(23))
+    for group, experiment in long_frame.groupby("Experiment"):
+        if group in (20, 21):
+            assert table.loc[group].isna().all()
+        else:
+            expected = numpy.polyfit(experiment[LABEL_CURRENT], experiment[LABEL_MAGNETIC_FIELD], degree)
+            numpy.testing.assert_allclose(table.loc[group].to_numpy(), expected, rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize("experiment_number", [1, 3])
+def test_remove_outliers_robust_keeps_clean_data(experiment_number):
+    data_frame = read_experiment_data(experiment_number, True)
+    for seed in range(5):
+        for method in ("sigma_clip", "ransac"):
+            result, removed_per_pass = ProcessData.remove_outliers_robust(
+                data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD, method=method, seed=seed)
+            assert len(result) == len(data_frame)
+            assert sum(removed_per_pass) == 0
+
+
+@pytest.mark.parametrize("method", ["sigma_clip", "ransac"])
+def test_remove_outliers_robust_removes_outliers(method):
+    data_frame, outlier_rows = hall_recording(numpy.random.default_rng(2), 1000, 100)
+    result, removed_per_pass = ProcessData.remove_outliers_robust(data_frame, LABEL_CURRENT, LABEL_MAGNETIC_FIELD,
+                                                                  method=method, seed=0)
+    assert not set(outlier_rows) & set(result.index)
+    assert len(result) >= len(data_frame) - len(outlier_rows) - 10
+    assert sum(removed_per_pass) == len(data_frame) - len(result)
+    if method == "ransac":
+        assert removed_per_pass[0] >= len(outlier_rows)
+
+
+def test_process_single_experiment_reports_passes(data_folder, capsys):
+    data_frame, _ = hall_recording(numpy.random.default_rng(3), 200, 10)
+    data_frame["Background Temperature T (°C)"] = 24
+    data_frame.to_csv(data_folder / "Raw" / "Experiment1.csv", index=False)
+    ProcessData.process_single_experiment(1, False, make_plots=False, outlier_method="ransac")
+    assert "Experiment 1 ransac removed outliers per pass: [" in capsys.readouterr().out
+
+
+@pytest.fixture
+def profile_reports(tmp_path, monkeypatch):
+    """
+    ydata_profiling replaced by a stub writing empty reports to a temporary Reports folder,
+    returns list of (frame, minimal) of the reports generated.
+    """
+    generated = []
+
+    class ProfileReport:
+        def __init__(self, data_frame, minimal=False, progress_bar=True):
+            generated.append((data_frame, minimal))
+
+        def to_file(self, file_path):
+            with open(file_path, "w") as file:
+                file.write("<html></html>")
+
+    monkeypatch.setitem(sys.modules, "ydata_profiling", types.SimpleNamespace(ProfileReport=ProfileReport))
+    monkeypatch.setattr(ProcessData, "REPORTS_FOLDER", str(tmp_path / "Reports"))
+    return generated
+
+
+def test_exploratory_analysis_report_cached(profile_reports):
+    data_frame = random_experiment(numpy.random.default_rng(0), 50)
+    file_path = ProcessData.exploratory_analysis_report(data_frame)
+    assert len(profile_reports) == 1
+    assert ProcessData.exploratory_analysis_report(data_frame.copy()) == file_path
+    assert len(profile_reports) == 1
+    assert os.listdir(ProcessData.REPORTS_FOLDER) == [os.path.basename(file_path)]
+    # Different data or options get their own report
+    changed = data_frame.copy()
+    changed.loc[10, LABEL_MAGNETIC_FIELD] += 1
+    minimal_path = ProcessData.exploratory_analysis_report(data_frame, minimal=True)
+    changed_path = ProcessData.exploratory_analysis_report(changed)
+    assert len({file_path, minimal_path, changed_path}) == 3
+    assert minimal_path.endswith("_minimal.html")
+    assert [minimal for _, minimal in profile_reports] == [False, True, False]
+
+
+def test_exploratory_analysis_report_sampled(profile_reports):
+    data_frame = random_experiment(numpy.random.default_rng(0), 500)
+    full_path = ProcessData.exploratory_analysis_report(data_frame, sample_size=None)
+    assert len(profile_reports[-1][0]) == 500
+    sampled_path = ProcessData.exploratory_analysis_report(data_frame, sample_size=100, seed=1)
+    sampled_frame = profile_reports[-1][0]
+    assert len(sampled_frame) == 100
+    assert sampled_frame.index.is_monotonic_increasing
+    assert sampled_path.endswith("_sample100_seed1.html")
+    assert sampled_path != full_path
+    assert ProcessData.exploratory_analysis_report(data_frame, sample_size=100, seed=2) != sampled_path
+    # Frames not longer than sample_size are not sampled
+    assert ProcessData.exploratory_analysis_report(data_frame, sample_size=500) == full_path
+    assert len(profile_reports) == 3
+
+
+def test_import_is_lazy():
+    heavy_modules = ["pandas", "matplotlib", "ydata_profiling"]
+    result = subprocess.run([sys.executable, "-c", "import ProcessData, sys; print([module for module in "
+                             + repr(heavy_modules) + " if module in sys.modules])"],
+                            cwd=PROJECT_FOLDER, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+    import_time, _ = measure_import_time("ProcessData", runs=3)
+    assert import_time < IMPORT_TIME_THRESHOLD